@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from .database import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +48,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'vocabulary.context_processors.site_config',
             ],
         },
     },
@@ -53,12 +57,10 @@ TEMPLATES = [
 WSGI_APPLICATION = 'project_name.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DATABASE_URL bo'lmasa - SQLite (WAL, busy_timeout); postgres://... - doimiy ulanishlar yoki pul (DB_POOL_MAX_SIZE,
+# psycopg 3 kerak). DATABASE_REPLICA_URL - lug'at va reyting o'qishlari uchun replika. Batafsil: project_name/database.py
+DATABASES = databases(BASE_DIR)
+DATABASE_ROUTERS = ['vocabulary.replica.ReplicaRouter']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -96,13 +98,95 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = 'login'
 
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+# O'yin holati sessiyada emas (GameSession jadvali), shuning uchun sessiya o'yin davomida qayta yozilmaydi.
+# SESSION_ENGINE=django.contrib.sessions.backends.cached_db (yoki .cache) - faqat umumiy kesh
+# (Redis/Memcached) bilan; standart LocMemCache bir nechta worker orasida mos kelmaydi.
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+# Xabarlar avval cookie da saqlanadi (sessiyaga yozilmaydi), sig'masa - sessiyada
+MESSAGE_STORAGE = 'django.contrib.messages.storage.fallback.FallbackStorage'
 
 CSRF_TRUSTED_ORIGINS = [
     'https://*.ngrok-free.app',
     'https://*.ngrok-free.dev',
 ]
 
+# 'shared' - worker lar (gunicorn/ASGI jarayonlari) birga ko'radigan kesh. Jarayon ichidagi keshlar
+# (SiteConfiguration, badge katalogi, typeahead) versiya belgisini shu yerda saqlaydi: admin da o'zgartirilsa
+# barcha worker lar yangi qiymatni o'qiydi. Fayl keshi bitta serverdagi jarayonlar uchun yetarli;
+# bir nechta server bo'lsa Redis/Memcached ga almashtiring.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'TIMEOUT': None,
+    },
+}
+
+# Badge katalogi versiyasini saqlash uchun umumiy kesh (CACHES dagi nom).
+# None - faqat bitta worker li o'rnatish uchun (boshqa worker lar o'zgarishni ko'rmaydi).
+BADGE_CATALOG_CACHE = 'shared'
+# Lug'at typeahead indeksi (/api/search/) versiyasi uchun kesh nomi - xuddi shunday
+TYPEAHEAD_INDEX_CACHE = 'shared'
+# SiteConfiguration keshi (vocabulary/config.py) versiyasi uchun kesh nomi - xuddi shunday
+SITE_CONFIG_CACHE = 'shared'
+
+# Ligalar haftalik hisob-kitobi `python manage.py process_leagues` (cron, har Dushanba) bilan ishlaydi.
+# True bo'lsa, cron ishlamagan holatda leagues sahifasi ham uni ishga tushiradi - haftaning birinchi
+# tashrifchisi butun hisob-kitobni kutadi, shuning uchun faqat cron sozlanmagan o'rnatishlarda yoqing.
+LEAGUES_LAZY_PROCESSING = False
+
+# Excel yuklash vazifalari: jarayon ichidagi fon thread lari soni (0 - faqat `manage.py run_import_jobs`),
+# bitta tranzaksiyada yoziladigan qatorlar soni va yuklangan fayllar vaqtincha saqlanadigan papka
+IMPORT_WORKERS = 1
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_UPLOAD_DIR = BASE_DIR / 'imports'
+# "Yuklanmoqda" holatidagi vazifa shuncha soniya progress yozmasa (har qism yozilganda yangilanadi) to'xtab
+# qolgan hisoblanadi va qayta navbatga qo'yiladi; IMPORT_MAX_ATTEMPTS urinishdan keyin xatolik deb belgilanadi.
+# Tekshiruv jarayondagi birinchi so'rovda va keyin har IMPORT_RECOVERY_INTERVAL soniyada bajariladi
+IMPORT_STALE_TIMEOUT = 600
+IMPORT_MAX_ATTEMPTS = 3
+IMPORT_RECOVERY_INTERVAL = 300
+
+# TTS audio keshi (diskda): papka va maksimal hajm - oshsa eng uzoq eshitilmaganlari o'chiriladi
+TTS_CACHE_DIR = BASE_DIR / 'tts_cache'
+TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bir vaqtda nechta Edge TTS sintezi ishlashi mumkin (async /api/tts/, ASGI: project_name/asgi.py)
+TTS_MAX_CONCURRENCY = 4
+# Oldindan tayyorlash (pregenerate_tts) uchun sintezator: async (text, voice) -> bytes
+TTS_SYNTHESIZER = 'vocabulary.tts_utils.generate_edge_audio'
+# Admin dagi "audio tayyorlash" amali uchun alohida fon thread lari (0 - so'rov ichida bajariladi)
+TTS_WARMUP_WORKERS = 1
+
+# AI chat proksi (/api/ai-chat/). Kalit bo'sh bo'lsa SiteConfiguration.gemini_api_key ishlatiladi,
+# standart model ham SiteConfiguration.ai_model dan olinadi (LLM_DEFAULT_MODEL - zaxira).
+LLM_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+LLM_BASE_URL = os.environ.get('LLM_BASE_URL', 'https://generativelanguage.googleapis.com/v1beta')
+LLM_DEFAULT_MODEL = 'gemini-2.5-flash'
+LLM_MODELS = ('gemini-2.5-flash', 'gemini-2.0-flash', 'gemini-1.5-flash')
+LLM_TIMEOUT = 60
+# Deterministik (faqat matnli) javoblar keshi va foydalanuvchi limitlari shu keshda saqlanadi
+LLM_CACHE = 'default'
+LLM_CACHE_TIMEOUT = 7 * 24 * 3600
+LLM_RATE_LIMIT = 10 # daqiqasiga so'rov
+LLM_DAILY_TOKEN_BUDGET = 50000 # kunlik token
+
+# So'z boyitish (`manage.py enrich_words`): generator - 'vocabulary.enrichment.llm_generator' (AI)
+# yoki 'vocabulary.enrichment.offline_generator' (tarmoqsiz); xatolikda necha marta qayta urinish
+ENRICHMENT_GENERATOR = 'vocabulary.enrichment.llm_generator'
+ENRICHMENT_MODEL = None # None - LLM_DEFAULT_MODEL
+ENRICHMENT_MAX_ATTEMPTS = 3
+ENRICHMENT_RETRY_DELAY = 2 # soniya, har urinishda ikki barobar
+
+# Takrorlash rejalashtiruvchisi: 'ladder' (eski 1/3/7/14 kun), 'sm2' yoki 'fsrs'
+REVIEW_SCHEDULER = 'ladder'
+# Uzun intervallarni eng kam yuklangan kunga surish (kunlik takrorlash cho'qqilarini tekislash, sm2/fsrs da)
+REVIEW_LOAD_BALANCING = True
+# Kunlik yuklama bashorati keshi - bir nechta worker bo'lsa umumiy kesh (Redis/Memcached) nomini bering
+REVIEW_FORECAST_CACHE = 'default'
+
 # ==============================================================================
 #                 COMMENTED OUT "TUTORIAL" INSTRUCTIONS BELOW
 # ==============================================================================
@@ -1,10 +1,11 @@
-from django.contrib import admin
-from .models import Word, Topic, Profile, Book, WeeklyStats, UserWordProgress, SiteConfiguration
+from django.contrib import admin, messages
+from .models import Word, Topic, Profile, Book, WeeklyStats, UserWordProgress, SiteConfiguration, LeagueCohort, ImportJob, WordEnrichment
+from .tts_warmup import warm_in_background
 
 # 0. SITE CONFIGURATION
 @admin.register(SiteConfiguration)
 class SiteConfigurationAdmin(admin.ModelAdmin):
-    list_display = ('__str__', 'gemini_api_key')
+    list_display = ('__str__', 'gemini_api_key', 'ai_model', 'tts_voice', 'daily_test_limit', 'daily_match_limit', 'daily_write_limit', 'pass_accuracy')
 
     # Prevent adding more than one instance
     def has_add_permission(self, request):
@@ -12,11 +13,28 @@ class SiteConfigurationAdmin(admin.ModelAdmin):
             return False
         return super().has_add_permission(request)
 
+# TTS audio ni fonda oldindan tayyorlash (manage.py pregenerate_tts bilan bir xil)
+@admin.action(description="So'zlar audiosini tayyorlash (TTS)")
+def pregenerate_tts(modeladmin, request, queryset):
+    items = list(queryset)
+    books, topics = (items, ()) if queryset.model is Book else ((), items)
+    done = warm_in_background(books, topics)
+    if done is None:
+        modeladmin.message_user(request, f"{len(items)} ta uchun audio tayyorlash fonda boshlandi.", messages.INFO)
+    else:
+        result, total = done
+        modeladmin.message_user(
+            request,
+            f"{total} ta so'z: {result['created']} ta yangi, {result['skipped']} ta keshda bor, {result['failed']} ta xato.",
+            messages.WARNING if result['failed'] else messages.SUCCESS,
+        )
+
 # 1. BOOK (Yangi)
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
     list_display = ('title', 'created_at', 'get_topics_count')
     search_fields = ('title', 'description')
+    actions = [pregenerate_tts]
 
     def get_topics_count(self, obj):
         return obj.topics.count()
@@ -35,6 +53,7 @@ class TopicAdmin(admin.ModelAdmin):
     list_display = ('name', 'book')
     list_filter = ('book',)
     search_fields = ('name',)
+    actions = [pregenerate_tts]
 
 # 3. PROFILE
 if admin.site.is_registered(Profile):
@@ -75,3 +94,22 @@ class UserWordProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'word', 'level', 'xp', 'next_review_date')
     search_fields = ('user__username', 'word__japanese_word')
     list_filter = ('level', 'next_review_date')
+
+@admin.register(LeagueCohort)
+class LeagueCohortAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'league', 'week_start_date', 'size')
+    list_filter = ('league', 'week_start_date')
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'topic', 'status', 'processed_rows', 'total_rows', 'created_words', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'started_at', 'finished_at')
+
+@admin.register(WordEnrichment)
+class WordEnrichmentAdmin(admin.ModelAdmin):
+    list_display = ('word', 'jlpt_level', 'furigana', 'status', 'attempts', 'source', 'updated_at')
+    list_filter = ('status', 'jlpt_level', 'source')
+    search_fields = ('word__japanese_word', 'word__meaning')
+    raw_id_fields = ('word',)
+    readonly_fields = ('content_hash', 'updated_at')
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class VocabularyConfig(AppConfig):
+    name = 'vocabulary'
+
+    def ready(self):
+        # Signal qabul qiluvchilarni ulash
+        from . import badges, config, import_jobs, search, typeahead  # noqa: F401
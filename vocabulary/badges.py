@@ -0,0 +1,173 @@
+"""
+Yutuqlar (Badges) dvigateli.
+
+Hisoblagichlar Profile da saqlanadi va o'zgarish bo'lgan joyda (so'z qo'shish,
+kitob saqlash, javob berish...) yangilanadi. Faqat o'zgargan hisoblagich turi
+bo'yicha nishonlar tekshiriladi, shuning uchun sahifa ochilganda hech narsa
+qayta sanalmaydi.
+
+Nishonlar ro'yxati (Badge jadvali) faqat migratsiya yoki admin orqali o'zgaradi,
+shuning uchun u jarayon xotirasida (BadgeCatalog) saqlanadi.
+"""
+import threading
+import uuid
+from bisect import bisect_right
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Word, Profile, WeeklyStats, UserWordProgress, Badge, UserBadge
+
+# badge_type -> Profile dagi hisoblagich maydoni
+COUNTER_FIELDS = {
+    'words': 'words_count',
+    'streak': 'streak',
+    'coins': 'coins',
+    'books': 'books_count',
+    'master': 'mastered_count',
+    'correct': 'correct_count',
+}
+
+CATALOG_VERSION_KEY = 'vocabulary:badge_catalog:version'
+
+
+class BadgeCatalog:
+    """
+    Badge larning jarayon ichidagi keshi: badge_type bo'yicha guruhlangan va threshold bo'yicha saralangan.
+    Versiya settings.BADGE_CATALOG_CACHE keshida (standart - 'shared') saqlanadi va
+    bir nechta gunicorn worker bir-biriga mos holatda qoladi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (badges, by_type) - bitta atribut: parallel invalidate() yarim holatni ko'rsatmaydi
+        self._snapshot = None
+        self._version = None
+
+    def _shared_cache(self):
+        alias = getattr(settings, 'BADGE_CATALOG_CACHE', None)
+        return caches[alias] if alias else None
+
+    def _load(self):
+        """Joriy (badges, by_type) - chaqiruvchi faqat shu qaytgan qiymatdan foydalanadi"""
+        shared = self._shared_cache()
+        version = shared.get(CATALOG_VERSION_KEY) if shared else None
+        snapshot = self._snapshot
+        if snapshot is not None and version == self._version:
+            return snapshot
+
+        with self._lock:
+            badges = list(Badge.objects.order_by('threshold', 'id'))
+            by_type = {}
+            for badge in badges:
+                thresholds, items = by_type.setdefault(badge.badge_type, ([], []))
+                thresholds.append(badge.threshold)
+                items.append(badge)
+            snapshot = (badges, by_type)
+            self._snapshot = snapshot
+            self._version = version
+        return snapshot
+
+    def all(self):
+        """Barcha nishonlar (threshold bo'yicha saralangan)"""
+        badges, _ = self._load()
+        return badges
+
+    def reached(self, badge_type, value):
+        """badge_type bo'yicha threshold <= value bo'lgan nishonlar"""
+        _, by_type = self._load()
+        thresholds, items = by_type.get(badge_type, ([], []))
+        return items[:bisect_right(thresholds, value)]
+
+    def invalidate(self):
+        self._snapshot = None
+        shared = self._shared_cache()
+        if shared:
+            shared.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+catalog = BadgeCatalog()
+
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def invalidate_badge_catalog(sender, **kwargs):
+    # Tranzaksiya tugagach - aks holda parallel so'rov eski nishonlarni qayta yuklab, keshda qoldiradi
+    transaction.on_commit(catalog.invalidate)
+
+
+def award_badges(user, badge_type, value, previous=None):
+    """
+    badge_type bo'yicha `value` ga yetgan nishonlarni beradi.
+    Agar `previous` berilsa, (previous, value] oralig'ida yangi chegara bo'lmasa hech narsa yozilmaydi.
+    """
+    badges = catalog.reached(badge_type, value)
+    if not badges:
+        return
+    if previous is not None and not any(b.threshold > previous for b in badges):
+        return
+
+    UserBadge.objects.bulk_create(
+        [UserBadge(user=user, badge=badge) for badge in badges],
+        ignore_conflicts=True
+    )
+
+
+def bump_counter(user, badge_type, delta=1):
+    """
+    Profile dagi hisoblagichni atomik tarzda o'zgartiradi va faqat shu tur nishonlarini tekshiradi.
+    Yangi qiymatni qaytaradi.
+    """
+    if not delta:
+        return None
+
+    field = COUNTER_FIELDS[badge_type]
+    Profile.objects.filter(user=user).update(**{field: F(field) + delta})
+    value = Profile.objects.filter(user=user).values_list(field, flat=True).first()
+    if value is None:
+        return None
+
+    # Keshlangan user.profile ham eskirib qolmasligi uchun
+    cached_profile = user._state.fields_cache.get('profile')
+    if cached_profile is not None:
+        setattr(cached_profile, field, value)
+
+    if delta > 0:
+        award_badges(user, badge_type, value, previous=value - delta)
+    return value
+
+
+def check_badges(user):
+    """
+    Hisoblagichlarni manbadan qayta sanab chiqadi va barcha nishonlarni tekshiradi.
+    Og'ir funksiya - faqat login paytida (yoki qo'lda sinxronlash uchun) chaqiriladi,
+    admin paneldan qo'shilgan yangi nishonlar ham shu yerda beriladi.
+    """
+    profile, _ = Profile.objects.get_or_create(user=user)
+
+    profile.words_count = Word.objects.filter(author=user).count()
+    profile.books_count = user.saved_books.count()
+    profile.mastered_count = UserWordProgress.objects.filter(user=user, level__gte=5).count()
+    profile.correct_count = WeeklyStats.objects.filter(user=user).aggregate(total=models.Sum('correct_answers'))['total'] or 0
+    profile.save(update_fields=['words_count', 'books_count', 'mastered_count', 'correct_count'])
+
+    badges = []
+    for badge_type, field in COUNTER_FIELDS.items():
+        value = getattr(profile, field)
+        badges.extend(catalog.reached(badge_type, value))
+
+    if badges:
+        UserBadge.objects.bulk_create(
+            [UserBadge(user=user, badge=badge) for badge in badges],
+            ignore_conflicts=True
+        )
+
+
+@receiver(user_logged_in)
+def sync_badges_on_login(sender, user, **kwargs):
+    check_badges(user)
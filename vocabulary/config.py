@@ -0,0 +1,72 @@
+"""
+SiteConfiguration ning jarayon ichidagi keshi.
+
+Sozlamalar (AI modeli, TTS ovozi, o'yin limitlari) har so'rovda bazadan o'qilmaydi. Admin da saqlanganda
+post_save signali (tranzaksiya tugagach) keshni yangilaydi; versiya settings.SITE_CONFIG_CACHE keshida
+saqlanadi (standart - 'shared') va boshqa worker lar ham yangi qiymatni o'qiydi (badges.BadgeCatalog kabi).
+"""
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SiteConfiguration
+
+CONFIG_VERSION_KEY = 'vocabulary:site_config:version'
+
+
+class SiteConfigCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._config = None
+        self._version = None
+
+    def _shared_cache(self):
+        alias = getattr(settings, 'SITE_CONFIG_CACHE', None)
+        return caches[alias] if alias else None
+
+    def get(self):
+        """SiteConfiguration (bazada yo'q bo'lsa - standart qiymatli saqlanmagan obyekt)"""
+        shared = self._shared_cache()
+        version = shared.get(CONFIG_VERSION_KEY) if shared else None
+        config = self._config
+        if config is not None and version == self._version:
+            return config
+
+        with self._lock:
+            config = SiteConfiguration.objects.first() or SiteConfiguration()
+            self._config = config
+            self._version = version
+        return config
+
+    async def aget(self):
+        """Async view lar uchun: kesh tayyor bo'lsa thread ga o'tilmaydi"""
+        if self._config is not None and self._shared_cache() is None:
+            return self._config
+        return await sync_to_async(self.get)()
+
+    def invalidate(self):
+        self._config = None
+        shared = self._shared_cache()
+        if shared:
+            shared.set(CONFIG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+site_config = SiteConfigCache()
+
+
+def get_site_config():
+    return site_config.get()
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+def invalidate_site_config(sender, **kwargs):
+    # Commit dan oldin bekor qilinsa, parallel so'rov eski qatorni qayta o'qib, keshda qoldirishi mumkin
+    transaction.on_commit(site_config.invalidate)
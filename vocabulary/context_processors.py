@@ -0,0 +1,6 @@
+from .config import get_site_config
+
+
+def site_config(request):
+    """Shablonlarda {{ site_config.daily_test_limit }} va h.k. (keshdan, bazaga so'rovsiz)"""
+    return {'site_config': get_site_config()}
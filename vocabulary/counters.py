@@ -0,0 +1,60 @@
+"""
+Hisoblagichlar xizmati.
+
+WeeklyStats va Profile dagi sonlar "o'qi - o'zgartir - saqla" (.save()) o'rniga bitta
+UPDATE ... SET x = x + n so'rovi bilan o'zgartiriladi. Shunda faqat kerakli ustunlar
+yoziladi va bir vaqtda ochilgan ikki tab bir-birining natijasini o'chirib yubormaydi.
+"""
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .leagues import sync_leaderboard_xp
+from .models import Profile, WeeklyStats
+
+# Bu maydonlar 0 dan pastga tushmasligi kerak
+FLOORED_FIELDS = ('xp_earned',)
+
+
+def _apply(model, obj, deltas, floors):
+    updates = {}
+    for field, delta in deltas.items():
+        if not delta:
+            continue
+        expr = F(field) + delta
+        if field in floors:
+            expr = Greatest(expr, floors[field])
+        updates[field] = expr
+
+    if not updates:
+        return obj
+
+    model.objects.filter(pk=obj.pk).update(**updates)
+
+    # Xotiradagi obyekt ham eskirib qolmasligi uchun (shablonda ko'rsatish uchun)
+    for field in updates:
+        value = getattr(obj, field) + deltas[field]
+        if field in floors:
+            value = max(value, floors[field])
+        setattr(obj, field, value)
+    return obj
+
+
+def increment_weekly_stats(stats, xp_floor=0, **deltas):
+    """
+    WeeklyStats maydonlarini atomik oshiradi/kamaytiradi.
+    Masalan: increment_weekly_stats(stats, total_questions=1, correct_answers=1, xp_earned=1)
+    xp_earned hech qachon `xp_floor` (odatda 0) dan pastga tushmaydi.
+    """
+    floors = {field: xp_floor for field in FLOORED_FIELDS}
+    _apply(WeeklyStats, stats, deltas, floors)
+    if deltas.get('xp_earned'):
+        sync_leaderboard_xp(stats) # Liga reytingi
+    return stats
+
+
+def increment_profile(profile, **deltas):
+    """
+    Profile maydonlarini atomik oshiradi/kamaytiradi.
+    Masalan: increment_profile(profile, daily_test_count=1)
+    """
+    return _apply(Profile, profile, deltas, {})
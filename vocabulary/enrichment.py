@@ -0,0 +1,185 @@
+"""
+So'zlarni boyitish: misol gaplar, furigana, JLPT darajasi va eslab qolish usuli (WordEnrichment).
+
+Ma'lumot `python manage.py enrich_words` bilan oldindan tayyorlanadi - sahifalar uni oddiy JOIN bilan
+o'qiydi, AI ga so'rov yuborilmaydi.
+
+Generator - item (japanese_word, hiragana, meaning) -> dict funksiya, settings.ENRICHMENT_GENERATOR
+(yoki --generator) orqali tanlanadi:
+- llm_generator - AI proksi (llm.py) orqali Gemini dan JSON so'raydi;
+- offline_generator - tarmoqsiz, faqat hiragana dan furigana (AI kalitsiz muhit va testlar uchun).
+
+Bir xil so'zlar (kontent xeshi bo'yicha) bir marta tayyorlanadi; boshqa so'zda tayyor natija bo'lsa
+nusxa olinadi. Xatolikda ENRICHMENT_MAX_ATTEMPTS martagacha qayta uriniladi.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import llm
+from .kana import PARENS
+from .models import WordEnrichment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GENERATOR = 'vocabulary.enrichment.llm_generator'
+FIELDS = ('examples', 'furigana', 'jlpt_level', 'mnemonic')
+MAX_EXAMPLES = 3
+LOOKUP_CHUNK = 2000 # IN (...) ro'yxati uzunligi
+KANJI = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\u3005]')
+JLPT_LEVELS = {level for level, _ in WordEnrichment.JLPT_CHOICES}
+
+PROMPT = """You are a Japanese teacher for Uzbek-speaking learners. Return JSON for the word below with fields:
+"examples": up to {max_examples} short, natural example sentences, each an object with "japanese", "reading" (hiragana) and "meaning" (Uzbek translation);
+"furigana": the word as kanji[reading], e.g. 学校[がっこう] (empty string if the word has no kanji);
+"jlpt_level": one of N5, N4, N3, N2, N1 (empty string if unknown);
+"mnemonic": one short memory aid in Uzbek.
+
+Word: {japanese_word}
+Reading: {hiragana}
+Meaning (Uzbek): {meaning}"""
+
+
+def content_hash(japanese_word, hiragana, meaning):
+    return hashlib.sha256('\n'.join((japanese_word, hiragana or '', meaning or '')).encode('utf-8')).hexdigest()
+
+
+def get_generator(path=None):
+    path = path or getattr(settings, 'ENRICHMENT_GENERATOR', DEFAULT_GENERATOR)
+    return import_string(path), path.rsplit('.', 1)[-1]
+
+
+def offline_generator(item):
+    """Tarmoqsiz: kanji li so'z uchun hiragana dan furigana, qolgan maydonlar bo'sh"""
+    word = PARENS.sub('', item['japanese_word']).strip()
+    reading = item['hiragana'] or ''
+    return {
+        'furigana': f'{word}[{reading}]' if reading and KANJI.search(word) else '',
+    }
+
+
+def llm_generator(item):
+    prompt = PROMPT.format(max_examples=MAX_EXAMPLES, **{key: item[key] or '-' for key in ('japanese_word', 'hiragana', 'meaning')})
+    payload = {
+        'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+        'generationConfig': {'responseMimeType': 'application/json', 'temperature': 0},
+    }
+    model = getattr(settings, 'ENRICHMENT_MODEL', None) or llm.default_model()
+    text, _ = llm.generate(model, payload)
+    return json.loads(text)
+
+
+def clean(result):
+    """Generator javobini tekshiradi - noto'g'ri turdagi qiymatlar tashlab yuboriladi"""
+    if not isinstance(result, dict):
+        raise ValueError("Generator dict qaytarishi kerak")
+
+    def text(value, limit=None):
+        value = value.strip() if isinstance(value, str) else ''
+        return value[:limit] if limit else value
+
+    examples = []
+    for example in result.get('examples') or ():
+        if isinstance(example, dict) and text(example.get('japanese')):
+            examples.append({key: text(example.get(key)) for key in ('japanese', 'reading', 'meaning')})
+    jlpt_level = text(result.get('jlpt_level')).upper()
+    return {
+        'examples': examples[:MAX_EXAMPLES],
+        'furigana': text(result.get('furigana'), 255),
+        'jlpt_level': jlpt_level if jlpt_level in JLPT_LEVELS else '',
+        'mnemonic': text(result.get('mnemonic')),
+    }
+
+
+def _generate(generator, item, max_attempts, backoff):
+    """(natija yoki None, urinishlar soni, xato matni)"""
+    error = ''
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return clean(generator(item)), attempt, ''
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            logger.warning("Enrichment failed for %s (attempt %s): %s", item['japanese_word'], attempt, error)
+            if attempt < max_attempts:
+                time.sleep(backoff * 2 ** (attempt - 1))
+    return None, max_attempts, error
+
+
+def pending_groups(words, force=False, retry_failed=False):
+    """
+    Tayyorlanishi kerak bo'lgan so'zlar kontent xeshi bo'yicha guruhlangan:
+    {xesh: {'japanese_word', 'hiragana', 'meaning', 'ids': [...]}}
+    """
+    rows = words.values_list(
+        'id', 'japanese_word', 'hiragana', 'meaning', 'enrichment__content_hash', 'enrichment__status'
+    ).iterator(chunk_size=LOOKUP_CHUNK)
+
+    groups = {}
+    for word_id, japanese_word, hiragana, meaning, old_hash, status in rows:
+        key = content_hash(japanese_word, hiragana, meaning)
+        if not force and old_hash == key and (status == 'done' or not retry_failed):
+            continue
+        group = groups.setdefault(key, {'japanese_word': japanese_word, 'hiragana': hiragana, 'meaning': meaning, 'ids': []})
+        group['ids'].append(word_id)
+    return groups
+
+
+def _save(ids, key, data, source, status='done', attempts=0, error=''):
+    # Xatolikda avvalgi ma'lumot o'chirilmaydi - faqat holat yangilanadi (sahifada faqat 'done' ko'rsatiladi)
+    fields = FIELDS if status == 'done' else ()
+    WordEnrichment.objects.bulk_create(
+        [
+            WordEnrichment(
+                word_id=word_id, content_hash=key, source=source, status=status,
+                attempts=attempts, error=error, **data,
+            )
+            for word_id in ids
+        ],
+        update_conflicts=True,
+        unique_fields=['word'],
+        update_fields=['content_hash', *fields, 'source', 'status', 'attempts', 'error', 'updated_at'],
+    )
+
+
+def enrich_words(words, generator=None, force=False, retry_failed=False, limit=None):
+    """
+    `words` (Word queryset) uchun boyitishni tayyorlaydi. `generator` - dotted path yoki None (sozlamadan).
+    {'generated', 'copied', 'failed'} qaytaradi (so'zlar soni bo'yicha).
+    """
+    generate, source = get_generator(generator)
+    max_attempts = getattr(settings, 'ENRICHMENT_MAX_ATTEMPTS', 3)
+    backoff = getattr(settings, 'ENRICHMENT_RETRY_DELAY', 2)
+    result = {'generated': 0, 'copied': 0, 'failed': 0}
+
+    groups = pending_groups(words, force=force, retry_failed=retry_failed)
+    keys = list(groups)[:limit] if limit else list(groups)
+
+    # Boshqa so'zda (masalan, boshqa kitobdagi dublikatda) tayyor natija bo'lsa - nusxa olinadi
+    ready = {}
+    if not force:
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            done = WordEnrichment.objects.filter(content_hash__in=keys[start:start + LOOKUP_CHUNK], status='done')
+            for enrichment in done.only('content_hash', *FIELDS, 'source'):
+                ready.setdefault(enrichment.content_hash, enrichment)
+
+    for key in keys:
+        group = groups[key]
+        if key in ready:
+            done = ready[key]
+            _save(group['ids'], key, {field: getattr(done, field) for field in FIELDS}, done.source)
+            result['copied'] += len(group['ids'])
+            continue
+
+        data, attempts, error = _generate(generate, group, max_attempts, backoff)
+        if data is None:
+            _save(group['ids'], key, {}, source, status='failed', attempts=attempts, error=error[:1000])
+            result['failed'] += len(group['ids'])
+        else:
+            _save(group['ids'], key, data, source, attempts=attempts)
+            result['generated'] += len(group['ids'])
+    return result
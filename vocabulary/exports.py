@@ -0,0 +1,116 @@
+"""
+So'zlarni eksport qilish: CSV, XLSX va Anki (TSV).
+
+Qatorlar values_list(...).iterator(chunk_size) bilan o'qiladi - model obyektlari yaratilmaydi va
+butun jadval xotiraga yuklanmaydi. CSV va Anki StreamingHttpResponse orqali qatorma-qator
+yuboriladi, XLSX esa openpyxl write-only rejimida vaqtinchalik faylga yozilib, fayl bo'laklab uzatiladi.
+
+Ustunlar importer bilan bir xil (Japanese, Hiragana, Meaning, Topics) - eksport qilingan faylni
+qayta yuklash mumkin.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+from .models import Word
+from .review_queue import vocabulary_words
+
+HEADER = ('Japanese', 'Hiragana', 'Meaning', 'Topics')
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'anki': ('text/tab-separated-values; charset=utf-8', 'txt'),
+}
+
+
+def book_rows(book):
+    """Kitobdagi so'zlar - har bir (so'z, mavzu) juftligi alohida qator"""
+    return Word.topics.through.objects.filter(
+        topic__book=book, word__author__isnull=True
+    ).order_by('topic_id', 'word_id').values_list(
+        'word__japanese_word', 'word__hiragana', 'word__meaning', 'topic__name'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def topic_rows(topic):
+    return Word.topics.through.objects.filter(
+        topic=topic, word__author__isnull=True
+    ).order_by('word_id').values_list(
+        'word__japanese_word', 'word__hiragana', 'word__meaning', 'topic__name'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def user_rows(user, which='all'):
+    """Foydalanuvchi lug'ati: 'created' - o'zi qo'shgan, 'saved' - saqlagan, 'all' - ikkalasi"""
+    if which == 'created':
+        words = Word.objects.filter(author=user)
+    elif which == 'saved':
+        words = Word.objects.filter(id__in=Word.saves.through.objects.filter(user=user).values('word_id'))
+    else:
+        words = vocabulary_words(user)
+    return (
+        (japanese_word, hiragana, meaning, '')
+        for japanese_word, hiragana, meaning in words.order_by('id').values_list(
+            'japanese_word', 'hiragana', 'meaning'
+        ).iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni saqlamasdan qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' # Excel UTF-8 ni to'g'ri ochishi uchun BOM
+    yield writer.writerow(HEADER)
+    for japanese_word, hiragana, meaning, topic in rows:
+        yield writer.writerow((japanese_word, hiragana or '', meaning, topic or ''))
+
+
+def _anki_field(value):
+    return ' '.join(str(value or '').split()) # tab va yangi qatorlar maydonni buzadi
+
+
+def _anki_stream(rows):
+    # Anki 2.1.55+ fayl sarlavhasi: ajratuvchi, HTML yo'q, ustun nomlari
+    yield '#separator:tab\n#html:false\n#columns:Front\tReading\tBack\tTags\n'
+    for japanese_word, hiragana, meaning, topic in rows:
+        tag = _anki_field(topic).replace(' ', '_')
+        yield '\t'.join((_anki_field(japanese_word), _anki_field(hiragana), _anki_field(meaning), tag)) + '\n'
+
+
+def _xlsx_file(rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Words')
+    ws.append(HEADER)
+    for japanese_word, hiragana, meaning, topic in rows:
+        ws.append((japanese_word, hiragana or '', meaning, topic or ''))
+
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    return tmp
+
+
+def export_response(rows, export_format, filename):
+    """rows - (japanese_word, hiragana, meaning, topic) iteratori"""
+    if export_format not in FORMATS:
+        export_format = 'csv'
+    content_type, ext = FORMATS[export_format]
+    filename = f'{filename}.{ext}'
+
+    if export_format == 'xlsx':
+        return FileResponse(_xlsx_file(rows), as_attachment=True, filename=filename, content_type=content_type)
+
+    stream = _anki_stream(rows) if export_format == 'anki' else _csv_stream(rows)
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,67 @@
+"""
+O'yin holati (test / matching / yozish): har bir faol o'yin uchun GameSession jadvalida bitta qator.
+
+Har bir javob faqat shu qatorning hisoblagichlarini F() bilan oshiradi - django_session qatori o'yin
+davomida qayta yozilmaydi. O'yin tugaganda qator o'chiriladi; o'chirish natijani "band qilish" vazifasini
+ham bajaradi (natija sahifasi ikki marta ochilsa, ball ikki marta qo'shilmaydi).
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GameSession
+
+INFINITE = 'infinite'
+MAX_LIMIT = 32767 # GameSession.question_limit - PositiveSmallIntegerField
+MAX_ROUNDS = 10 # Matching: match_setup.html dagi eng katta tanlov
+
+
+def parse_limit(value, default, maximum=None):
+    """'infinite' -> None, '10' -> 10, noto'g'ri qiymat -> default. `maximum` (lug'atdagi so'zlar soni) dan oshmaydi"""
+    if value == INFINITE:
+        return None
+    try:
+        limit = max(int(value), 1)
+    except (TypeError, ValueError):
+        limit = default
+    if maximum is not None:
+        limit = min(limit, max(maximum, 1))
+    return min(limit, MAX_LIMIT)
+
+
+def start(user, game, limit=None, rounds=0, potential_coins=0):
+    """Yangi o'yin (shu o'yinning avvalgi tugallanmagan holati ustidan yoziladi)"""
+    session, _ = GameSession.objects.update_or_create(user=user, game=game, defaults={
+        'question_limit': limit,
+        'rounds': rounds,
+        'total_questions': 0,
+        'correct': 0,
+        'wrong': 0,
+        'potential_coins': potential_coins,
+        'started_at': timezone.now(),
+    })
+    return session
+
+
+def active(user, game):
+    return GameSession.objects.filter(user=user, game=game).first()
+
+
+def record(session, answered=1, correct=0, coins=0):
+    """Javob(lar)ni hisobga oladi: bitta UPDATE, obyekt ham yangilanadi"""
+    wrong = answered - correct
+    GameSession.objects.filter(pk=session.pk).update(
+        total_questions=F('total_questions') + answered,
+        correct=F('correct') + correct,
+        wrong=F('wrong') + wrong,
+        potential_coins=F('potential_coins') + coins,
+    )
+    session.total_questions += answered
+    session.correct += correct
+    session.wrong += wrong
+    session.potential_coins += coins
+
+
+def finish(session):
+    """O'yinni yopadi. False - boshqa so'rov allaqachon yopgan."""
+    deleted, _ = GameSession.objects.filter(pk=session.pk).delete()
+    return deleted > 0
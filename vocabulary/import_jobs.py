@@ -0,0 +1,285 @@
+"""
+Fonda ishlaydigan Excel/CSV yuklash vazifalari.
+
+Yuklangan fayl settings.IMPORT_UPLOAD_DIR ga saqlanadi va ImportJob yaratiladi. Vazifani shu
+jarayon ichidagi thread pool (tashqi broker kerak emas) bajaradi: fayl openpyxl read-only rejimida
+qatorma-qator o'qiladi va har IMPORT_CHUNK_SIZE qator importer.import_rows orqali alohida
+tranzaksiyada yoziladi. Progress ImportJob da saqlanadi, yuklash sahifasi uni so'rab turadi.
+
+IMPORT_WORKERS = 0 bo'lsa vazifalar faqat `python manage.py run_import_jobs` bilan bajariladi.
+
+Jarayon import o'rtasida to'xtasa vazifa 'running' holatida qolib ketadi, pool navbatidagilari esa
+'pending' holatida. Har qism yozilganda heartbeat_at yangilanadi; IMPORT_STALE_TIMEOUT davomida
+yangilanmagan 'running' vazifalar recover_stale_jobs bilan navbatga qaytariladi (import_rows takroran
+ishlatilsa dublikat yaratmaydi), IMPORT_MAX_ATTEMPTS urinishdan keyin esa xatolik deb belgilanadi.
+Tekshiruv run_import_jobs buyrug'i boshida, jarayonda esa birinchi so'rovda va keyin har
+IMPORT_RECOVERY_INTERVAL soniyada bajariladi - bunda egasiz 'pending' vazifalar ham pool ga qo'yiladi.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.dispatch import receiver
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from .importer import SheetError, clean_frame, import_rows
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_queued = set() # shu jarayon pool idagi vazifalar - qayta qo'yilmasin
+_last_recovery = None
+
+
+def _workers():
+    return getattr(settings, 'IMPORT_WORKERS', 1)
+
+
+def _chunk_size():
+    return getattr(settings, 'IMPORT_CHUNK_SIZE', 1000)
+
+
+def _upload_dir():
+    path = getattr(settings, 'IMPORT_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'imports'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix='import-job')
+        return _executor
+
+
+def _submit(job_id):
+    executor = _get_executor()
+    with _executor_lock:
+        if job_id in _queued:
+            return
+        _queued.add(job_id)
+    executor.submit(_run_queued, job_id)
+
+
+def _run_queued(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        with _executor_lock:
+            _queued.discard(job_id)
+
+
+@receiver(request_started)
+def schedule_recovery(**kwargs):
+    """Jarayondagi birinchi so'rovda va keyin har IMPORT_RECOVERY_INTERVAL soniyada - fonda"""
+    global _last_recovery
+    if _workers() <= 0:
+        return
+    now = time.monotonic()
+    with _executor_lock:
+        interval = getattr(settings, 'IMPORT_RECOVERY_INTERVAL', 300)
+        if _last_recovery is not None and now - _last_recovery < interval:
+            return
+        _last_recovery = now
+    _get_executor().submit(_recover)
+
+
+def _recover():
+    close_old_connections()
+    try:
+        recover_stale_jobs()
+        # To'xtagan jarayon pool ida qolib ketgan vazifalar ham shu yerda olinadi. Boshqa jarayon
+        # navbatidagisi ikki marta qo'yilsa ham bir marta bajariladi (run_job da status bo'yicha olinadi)
+        for job_id in ImportJob.objects.filter(status='pending').order_by('id').values_list('id', flat=True):
+            _submit(job_id)
+    except Exception:
+        logger.exception("Import job recovery failed")
+    finally:
+        close_old_connections()
+
+
+def recover_stale_jobs(timeout=None):
+    """
+    `timeout` soniya progress yozmagan 'running' vazifalarni navbatga qaytaradi (fayl bo'lsa va
+    urinishlar tugamagan bo'lsa), qolganlarini 'failed' qiladi. Navbatga qaytganlar id larini qaytaradi.
+    """
+    timeout = timeout if timeout is not None else getattr(settings, 'IMPORT_STALE_TIMEOUT', 600)
+    max_attempts = getattr(settings, 'IMPORT_MAX_ATTEMPTS', 3)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = ImportJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='running',
+    )
+
+    requeued = []
+    for job in stale.only('id', 'file_path', 'attempts'):
+        jobs = ImportJob.objects.filter(id=job.id, status='running')
+        if job.attempts < max_attempts and os.path.exists(job.file_path):
+            # Qayta boshidan o'qiladi; created_words saqlanadi (mavjud so'zlar qayta yaratilmaydi)
+            if jobs.update(status='pending', processed_rows=0, started_at=None, heartbeat_at=None):
+                requeued.append(job.id)
+                logger.warning("Import #%s was interrupted, requeued", job.id)
+        else:
+            jobs.update(
+                status='failed',
+                error="Yuklash to'xtab qoldi (server qayta ishga tushgan bo'lishi mumkin).",
+                finished_at=timezone.now(),
+            )
+            logger.warning("Import #%s was interrupted, marked as failed", job.id)
+    return requeued
+
+
+def _extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def count_rows(path):
+    """Sarlavhasiz qatorlar soni (xlsx da varaq o'lchami bo'yicha - taxminiy)"""
+    ext = _extension(path)
+    if ext == '.csv':
+        with open(path, 'rb') as f:
+            return max(0, sum(1 for _ in f) - 1)
+    if ext == '.xls':
+        return 0
+    wb = load_workbook(path, read_only=True)
+    try:
+        return max(0, (wb.active.max_row or 1) - 1)
+    finally:
+        wb.close()
+
+
+def iter_chunks(path, chunk_size=None):
+    """Faylni `chunk_size` qatorlik DataFrame lar bilan o'qiydi (butun fayl xotiraga yuklanmaydi)"""
+    chunk_size = chunk_size or _chunk_size()
+    ext = _extension(path)
+
+    if ext == '.csv':
+        yield from pd.read_csv(path, dtype=str, chunksize=chunk_size)
+        return
+
+    if ext == '.xls':
+        # Eski format openpyxl da ochilmaydi - butunlay o'qib, qismlarga bo'linadi
+        df = pd.read_excel(path, dtype=str)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        width = len(header)
+
+        batch = []
+        for row in rows:
+            row = [str(cell) if cell is not None else None for cell in row[:width]]
+            batch.append(row + [None] * (width - len(row)))
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def start_import(uploaded_file, user=None, topic=None):
+    """Faylni saqlaydi, ImportJob yaratadi va (tranzaksiyadan keyin) navbatga qo'yadi"""
+    ext = _extension(uploaded_file.name) or '.xlsx'
+    path = os.path.join(_upload_dir(), f'{uuid.uuid4().hex}{ext}')
+    with open(path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+
+    job = ImportJob.objects.create(
+        created_by=user,
+        topic=topic,
+        file_path=path,
+        original_name=uploaded_file.name[:255],
+    )
+    if _workers() > 0:
+        transaction.on_commit(lambda: _submit(job.id))
+    return job
+
+
+def run_job(job_id):
+    """Vazifani bajaradi. Boshqa worker allaqachon olgan bo'lsa hech narsa qilmaydi."""
+    close_old_connections()
+    try:
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(id=job_id, status='pending').update(
+            status='running', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+        if not claimed:
+            return
+        job = ImportJob.objects.select_related('topic').get(id=job_id)
+        _process(job)
+    finally:
+        close_old_connections()
+
+
+class _Reclaimed(Exception):
+    """Vazifa to'xtab qolgan deb qayta navbatga qo'yilgan - uni endi boshqa urinish bajaradi"""
+
+
+def _process(job):
+    # Faqat shu urinish yozadi: qayta navbatga qo'yilgan bo'lsa eski worker to'xtaydi
+    jobs = ImportJob.objects.filter(id=job.id, status='running', attempts=job.attempts)
+    try:
+        if not jobs.update(total_rows=count_rows(job.file_path), heartbeat_at=timezone.now()):
+            raise _Reclaimed
+        for chunk in iter_chunks(job.file_path):
+            # Har bir qism o'z tranzaksiyasida - xatolik bo'lsa oldingi qismlar saqlanib qoladi
+            result = import_rows(clean_frame(chunk), topic=job.topic)
+            if not jobs.update(
+                processed_rows=F('processed_rows') + len(chunk),
+                created_words=F('created_words') + result['created'],
+                heartbeat_at=timezone.now(),
+            ):
+                raise _Reclaimed
+        finished = jobs.update(status='done', finished_at=timezone.now())
+    except _Reclaimed:
+        finished = 0
+    except SheetError as e:
+        finished = jobs.update(status='failed', error=str(e), finished_at=timezone.now())
+    except Exception as e:
+        logger.exception("Import #%s failed", job.id)
+        finished = jobs.update(status='failed', error=str(e), finished_at=timezone.now())
+
+    if not finished:
+        # Fayl yangi urinish uchun qoladi
+        logger.warning("Import #%s was requeued while running, this attempt stopped", job.id)
+        return
+    try:
+        os.remove(job.file_path)
+    except OSError:
+        pass
+
+
+def job_status(job):
+    return {
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'file': job.original_name,
+        'topic': job.topic.name if job.topic_id else None,
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'created_words': job.created_words,
+        'percent': job.percent,
+        'error': job.error,
+        'finished': job.status in ('done', 'failed'),
+    }
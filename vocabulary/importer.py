@@ -0,0 +1,148 @@
+"""
+Excel/CSV dan so'zlarni ommaviy yuklash.
+
+Fayl bir marta o'qiladi, tozalash pandas da vektorlashtirilgan holda qilinadi, mavjud so'z va
+mavzular to'plam bo'yicha bir nechta so'rov bilan topiladi, yozish esa bulk_create / bulk_update
+va M2M oraliq jadvaliga ommaviy INSERT orqali bitta tranzaksiyada bajariladi.
+
+Ustunlar: Japanese, Hiragana, Meaning va (ixtiyoriy) Topics - vergul bilan ajratilgan mavzular.
+So'zlar tizim so'zlari (author=None) orasidan japanese_word bo'yicha moslashtiriladi;
+mavjud so'zning ma'lumotlari o'zgarmaydi, faqat bo'sh hiragana to'ldiriladi.
+"""
+import os
+
+import pandas as pd
+from django.db import transaction
+
+from . import search
+from .models import Word, Topic
+from .typeahead import index as typeahead_index
+
+REQUIRED_COLUMNS = ('Japanese', 'Hiragana', 'Meaning')
+LOOKUP_CHUNK = 2000 # IN (...) ro'yxati uzunligi
+
+
+class SheetError(ValueError):
+    """Fayl tuzilishi noto'g'ri (masalan, ustun yetishmaydi)"""
+
+
+def read_sheet(file):
+    """Excel (.xlsx/.xls) yoki CSV faylni DataFrame ga o'qiydi"""
+    name = getattr(file, 'name', '') or ''
+    if os.path.splitext(name)[1].lower() == '.csv':
+        return pd.read_csv(file, dtype=str)
+    return pd.read_excel(file, dtype=str)
+
+
+def clean_frame(df):
+    """
+    Ustunlarni tekshiradi va tozalaydi: bo'sh qiymatlar '', chetdagi bo'shliqlar olib tashlanadi,
+    Japanese bo'sh bo'lgan qatorlar tashlab yuboriladi. topics - mavzu nomlari ro'yxati.
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise SheetError(f"Ustun topilmadi: {', '.join(missing)}")
+
+    def column(name):
+        if name not in df.columns:
+            return pd.Series('', index=df.index)
+        return df[name].fillna('').astype(str).str.strip()
+
+    cleaned = pd.DataFrame({
+        'japanese': column('Japanese'),
+        'hiragana': column('Hiragana'),
+        'meaning': column('Meaning'),
+        'topics': column('Topics').str.split(','),
+    })
+    cleaned['topics'] = cleaned['topics'].map(lambda names: [n.strip() for n in names if n.strip()])
+    return cleaned[cleaned['japanese'] != ''].reset_index(drop=True)
+
+
+def _chunks(items, size=LOOKUP_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing_words(japanese_words):
+    words = {}
+    for chunk in _chunks(japanese_words):
+        # Bir xil so'z bir necha marta bo'lsa, eng eskisi (kichik id) olinadi
+        for word in Word.objects.filter(author__isnull=True, japanese_word__in=chunk).order_by('-id'):
+            words[word.japanese_word] = word
+    return words
+
+
+def _resolve_topics(names):
+    """Mavzu nomi -> id. Yo'qlari yaratiladi."""
+    topics = {}
+    for chunk in _chunks(names):
+        for topic_id, name in Topic.objects.filter(name__in=chunk).order_by('-id').values_list('id', 'name'):
+            topics[name] = topic_id
+
+    missing = [name for name in names if name not in topics]
+    for topic in Topic.objects.bulk_create([Topic(name=name) for name in missing]):
+        topics[topic.name] = topic.id
+    return topics
+
+
+def import_rows(df, topic=None):
+    """
+    Tozalangan DataFrame (clean_frame) ni bazaga yozadi. `topic` berilsa hamma so'z shu mavzuga
+    qo'shiladi, aks holda Topics ustunidagi mavzularga.
+    {'rows', 'created', 'updated', 'linked'} qaytaradi.
+    """
+    if df.empty:
+        return {'rows': 0, 'created': 0, 'updated': 0, 'linked': 0}
+
+    # Faylda takrorlangan so'z: birinchi qator ma'lumoti olinadi (avvalgi get_or_create kabi)
+    first = df.drop_duplicates('japanese')
+
+    with transaction.atomic():
+        words = _existing_words(first['japanese'])
+
+        new_rows = first[~first['japanese'].isin(words.keys())]
+        created = Word.objects.bulk_create([
+            Word(japanese_word=row.japanese, hiragana=row.hiragana, meaning=row.meaning)
+            for row in new_rows.itertuples(index=False)
+        ], batch_size=LOOKUP_CHUNK)
+        words.update((word.japanese_word, word) for word in created)
+
+        hiragana = dict(zip(first['japanese'], first['hiragana']))
+        updated = []
+        for word in words.values():
+            if not word.hiragana and hiragana.get(word.japanese_word):
+                word.hiragana = hiragana[word.japanese_word]
+                updated.append(word)
+        Word.objects.bulk_update(updated, ['hiragana'], batch_size=LOOKUP_CHUNK)
+
+        # So'z - mavzu juftliklari
+        if topic is not None:
+            pairs = {(words[japanese].id, topic.id) for japanese in first['japanese']}
+        else:
+            exploded = df[['japanese', 'topics']].explode('topics').dropna()
+            topic_ids = _resolve_topics(sorted(set(exploded['topics'])))
+            pairs = {
+                (words[japanese].id, topic_ids[name])
+                for japanese, name in zip(exploded['japanese'], exploded['topics'])
+            }
+
+        Through = Word.topics.through
+        Through.objects.bulk_create(
+            [Through(word_id=word_id, topic_id=topic_id) for word_id, topic_id in pairs],
+            ignore_conflicts=True,
+            batch_size=LOOKUP_CHUNK,
+        )
+
+        # bulk_create / bulk_update signallarni chaqirmaydi - indekslar qo'lda yangilanadi
+        changed = created + updated
+        search.index_word_forms(changed)
+        search.index_words([word.id for word in changed])
+        if changed:
+            transaction.on_commit(typeahead_index.invalidate)
+
+    return {'rows': len(df), 'created': len(created), 'updated': len(updated), 'linked': len(pairs)}
+
+
+def import_file(file, topic=None):
+    return import_rows(clean_frame(read_sheet(file)), topic=topic)
@@ -0,0 +1,127 @@
+"""
+Yapon yozuvini normallashtirish.
+
+Bir so'zning turli yozilishlari bitta shaklga keltiriladi:
+- to'liq/yarim kenglikdagi belgilar (ＡＢＣ, ｶﾀｶﾅ) - NFKC
+- katakana -> hiragana
+- kana -> romaji (Hepburn), romaji dagi cho'ziq unlilar (ō -> ou)
+- "漢字 (かんじ)" ko'rinishidagi qavs ichidagi variantlar alohida shakl sifatida
+"""
+import re
+import unicodedata
+
+KATAKANA_START = 0x30A1
+KATAKANA_END = 0x30F6
+KANA_SHIFT = 0x60
+FORM_MAX_LENGTH = 255 # WordForm.form
+
+PARENS = re.compile(r'[(（](.*?)[)）]')
+SPACES = re.compile(r'\s+')
+KANA_ONLY = re.compile(r'^[ぁ-ゟー]+$')
+JAPANESE = re.compile(r'[ぁ-ヿ一-鿿]')
+
+MACRONS = str.maketrans({'ā': 'aa', 'ī': 'ii', 'ū': 'uu', 'ē': 'ee', 'ō': 'ou', 'â': 'aa', 'î': 'ii', 'û': 'uu', 'ê': 'ee', 'ô': 'ou'})
+
+ROMAJI = {
+    'あ': 'a', 'い': 'i', 'う': 'u', 'え': 'e', 'お': 'o',
+    'か': 'ka', 'き': 'ki', 'く': 'ku', 'け': 'ke', 'こ': 'ko',
+    'さ': 'sa', 'し': 'shi', 'す': 'su', 'せ': 'se', 'そ': 'so',
+    'た': 'ta', 'ち': 'chi', 'つ': 'tsu', 'て': 'te', 'と': 'to',
+    'な': 'na', 'に': 'ni', 'ぬ': 'nu', 'ね': 'ne', 'の': 'no',
+    'は': 'ha', 'ひ': 'hi', 'ふ': 'fu', 'へ': 'he', 'ほ': 'ho',
+    'ま': 'ma', 'み': 'mi', 'む': 'mu', 'め': 'me', 'も': 'mo',
+    'や': 'ya', 'ゆ': 'yu', 'よ': 'yo',
+    'ら': 'ra', 'り': 'ri', 'る': 'ru', 'れ': 're', 'ろ': 'ro',
+    'わ': 'wa', 'ゐ': 'i', 'ゑ': 'e', 'を': 'o', 'ん': 'n',
+    'が': 'ga', 'ぎ': 'gi', 'ぐ': 'gu', 'げ': 'ge', 'ご': 'go',
+    'ざ': 'za', 'じ': 'ji', 'ず': 'zu', 'ぜ': 'ze', 'ぞ': 'zo',
+    'だ': 'da', 'ぢ': 'ji', 'づ': 'zu', 'で': 'de', 'ど': 'do',
+    'ば': 'ba', 'び': 'bi', 'ぶ': 'bu', 'べ': 'be', 'ぼ': 'bo',
+    'ぱ': 'pa', 'ぴ': 'pi', 'ぷ': 'pu', 'ぺ': 'pe', 'ぽ': 'po',
+    'ゔ': 'vu',
+    'ぁ': 'a', 'ぃ': 'i', 'ぅ': 'u', 'ぇ': 'e', 'ぉ': 'o', 'ゎ': 'wa',
+}
+
+# Kichik ya/yu/yo bilan qo'shiladigan bo'g'inlar (きゃ -> kya, しゃ -> sha)
+YOON = {'ゃ': 'a', 'ゅ': 'u', 'ょ': 'o'}
+
+
+def to_hiragana(text):
+    return ''.join(
+        chr(ord(ch) - KANA_SHIFT) if KATAKANA_START <= ord(ch) <= KATAKANA_END else ch
+        for ch in text
+    )
+
+
+def normalize(text):
+    """Taqqoslash uchun yagona shakl: NFKC, kichik harf, hiragana, bo'shliqlarsiz"""
+    text = unicodedata.normalize('NFKC', text or '').lower().translate(MACRONS)
+    return SPACES.sub('', to_hiragana(text))
+
+
+def to_romaji(kana):
+    """Hiragana (yoki katakana) ni Hepburn romaji ga o'giradi"""
+    kana = to_hiragana(kana)
+    result = []
+    double_next = False
+    i = 0
+    while i < len(kana):
+        ch = kana[i]
+        nxt = kana[i + 1] if i + 1 < len(kana) else ''
+
+        if ch == 'っ':
+            double_next = True
+            i += 1
+            continue
+
+        if ch == 'ー':
+            # Cho'ziq unli: oldingi unli takrorlanadi
+            if result and result[-1][-1:] in 'aiueo':
+                result.append(result[-1][-1])
+            i += 1
+            continue
+
+        syllable = ROMAJI.get(ch, ch)
+        if nxt in YOON and ch in ROMAJI and syllable.endswith('i') and len(syllable) > 1:
+            base = syllable[:-1]
+            syllable = base + YOON[nxt] if base in ('sh', 'ch', 'j') else base + 'y' + YOON[nxt]
+            i += 1
+
+        if double_next:
+            syllable = ('t' if syllable.startswith('ch') else syllable[0]) + syllable
+            double_next = False
+
+        result.append(syllable)
+        i += 1
+    return ''.join(result)
+
+
+def split_variants(text):
+    """'漢字 (かんじ)' -> ['漢字 (かんじ)', '漢字', 'かんじ']"""
+    variants = [text]
+    inner = PARENS.findall(text or '')
+    outer = PARENS.sub('', text or '').strip()
+    if inner:
+        variants.append(outer)
+        variants.extend(inner)
+    return [v.strip() for v in variants if v and v.strip()]
+
+
+def has_japanese(text):
+    return bool(JAPANESE.search(text or ''))
+
+
+def word_forms(japanese_word, hiragana=None):
+    """
+    So'zning barcha normallashtirilgan shakllari (qidiruv va yozish o'yini javoblari uchun).
+    Faqat kanadan iborat shakllarning romaji varianti ham qo'shiladi.
+    """
+    forms = set()
+    for text in split_variants(japanese_word) + split_variants(hiragana or ''):
+        form = normalize(text)
+        if not form:
+            continue
+        forms.add(form[:FORM_MAX_LENGTH])
+        if KANA_ONLY.match(form):
+            forms.add(to_romaji(form)[:FORM_MAX_LENGTH])
+    return forms
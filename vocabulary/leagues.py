@@ -0,0 +1,253 @@
+"""
+Haftalik liga hisob-kitobi (Promotion / Demotion).
+
+Scheduler (cron) orqali `python manage.py process_leagues` bilan ishga tushiriladi.
+Har bir liga har hafta COHORT_SIZE kishilik guruhlarga (LeagueCohort) bo'linadi,
+reyting va Promotion/Demotion shu guruh ichida ishlaydi. Guruh reytingi CohortMembership.xp
+ustunida saqlanadi va XP o'zgarganda yangilanadi, shuning uchun sahifa hech narsani qayta saralamaydi.
+Reyting SQL oyna funksiyalari (ROW_NUMBER() OVER (PARTITION BY league, cohort ...)) bilan
+hisoblanadi va natija har bir liga uchun bitta UPDATE bilan yoziladi.
+LeagueLog bir hafta ikki marta hisoblanmasligini kafolatlaydi.
+"""
+import random
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from .models import Profile, WeeklyStats, LeagueLog, LeagueCohort, CohortMembership
+
+LEAGUES_ORDER = ['Bronze', 'Silver', 'Gold', 'Platinum', 'Diamond']
+PROMOTE_COUNT = 5 # Top 5 kishi ko'tariladi
+DEMOTE_COUNT = 5  # Bottom 5 kishi tushadi
+COHORT_SIZE = 30  # Bitta guruhdagi maksimal odamlar soni
+
+
+def current_week_start(today=None):
+    """Joriy haftaning Dushanbasi"""
+    today = today or timezone.now().date()
+    return today - timedelta(days=today.weekday())
+
+
+def last_week_start(today=None):
+    """O'tgan haftaning Dushanbasi"""
+    return current_week_start(today) - timedelta(days=7)
+
+
+def split_evenly(items, max_size):
+    """
+    ceil(n / max_size) ta deyarli teng bo'lak (farqi ko'pi bilan 1): 65 ta -> 22, 22, 21.
+    Oddiy kesishda 30, 30, 5 chiqadi - kichik guruhda ko'tarilish/tushish deyarli hammaga tegadi.
+    """
+    count = -(-len(items) // max_size)
+    if not count:
+        return []
+    size, extra = divmod(len(items), count)
+    chunks, start = [], 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def assign_cohorts(week_start):
+    """
+    Shu hafta hali guruhga kirmagan barcha profillarni ligasi bo'yicha
+    ko'pi bilan COHORT_SIZE kishilik, deyarli teng guruhlarga bo'ladi. Yangi a'zolar sonini qaytaradi.
+    """
+    assigned = CohortMembership.objects.filter(week_start_date=week_start).values('user_id')
+    total = 0
+
+    with transaction.atomic():
+        for league in LEAGUES_ORDER:
+            user_ids = list(
+                Profile.objects.filter(league=league)
+                .exclude(user_id__in=assigned)
+                .values_list('user_id', flat=True)
+            )
+            if not user_ids:
+                continue
+            random.shuffle(user_ids)
+
+            xp_map = dict(
+                WeeklyStats.objects.filter(start_date=week_start, user_id__in=user_ids)
+                .values_list('user_id', 'xp_earned')
+            )
+            chunks = split_evenly(user_ids, COHORT_SIZE)
+            cohorts = LeagueCohort.objects.bulk_create([
+                LeagueCohort(league=league, week_start_date=week_start, size=len(chunk))
+                for chunk in chunks
+            ])
+            CohortMembership.objects.bulk_create([
+                CohortMembership(
+                    cohort=cohort, user_id=user_id, week_start_date=week_start, xp=xp_map.get(user_id, 0)
+                )
+                for cohort, chunk in zip(cohorts, chunks)
+                for user_id in chunk
+            ], batch_size=500)
+            total += len(user_ids)
+    return total
+
+
+def get_user_membership(user, week_start=None):
+    """
+    Foydalanuvchining shu haftadagi guruh a'zoligini (CohortMembership) qaytaradi.
+    Guruhi bo'lmasa (masalan hafta o'rtasida ro'yxatdan o'tgan), ligasidagi bo'sh joyi bor guruhga qo'shadi.
+    """
+    week_start = week_start or current_week_start()
+    membership = CohortMembership.objects.filter(
+        user=user, week_start_date=week_start
+    ).select_related('cohort').first()
+    if membership:
+        return membership
+
+    league = Profile.objects.filter(user=user).values_list('league', flat=True).first() or LEAGUES_ORDER[0]
+    with transaction.atomic():
+        cohort = LeagueCohort.objects.select_for_update().filter(
+            league=league, week_start_date=week_start, size__lt=COHORT_SIZE
+        ).order_by('id').first()
+        if cohort is None:
+            cohort = LeagueCohort.objects.create(league=league, week_start_date=week_start)
+
+        xp = WeeklyStats.objects.filter(
+            user=user, start_date=week_start
+        ).values_list('xp_earned', flat=True).first() or 0
+        try:
+            with transaction.atomic():
+                membership = CohortMembership.objects.create(
+                    cohort=cohort, user=user, week_start_date=week_start, xp=xp
+                )
+        except IntegrityError:
+            # Parallel so'rov allaqachon qo'shib bo'lgan
+            return CohortMembership.objects.select_related('cohort').get(
+                user=user, week_start_date=week_start
+            )
+
+        LeagueCohort.objects.filter(pk=cohort.pk).update(size=F('size') + 1)
+        cohort.size += 1
+    return membership
+
+
+def sync_leaderboard_xp(stats):
+    """
+    WeeklyStats.xp_earned o'zgargandan keyin chaqiriladi: guruh reytingidagi XP ni
+    bitta UPDATE bilan DB dagi qiymatga tenglashtiradi.
+    """
+    CohortMembership.objects.filter(
+        user_id=stats.user_id,
+        week_start_date=stats.start_date
+    ).update(
+        xp=Subquery(WeeklyStats.objects.filter(pk=stats.pk).values('xp_earned')[:1])
+    )
+
+
+def cohort_leaderboard(cohort, limit=COHORT_SIZE):
+    """Guruhning top-N reytingi (index: cohort, -xp, user)"""
+    return CohortMembership.objects.filter(cohort=cohort).select_related(
+        'user__profile'
+    ).order_by('-xp', 'user_id')[:limit]
+
+
+def cohort_rank(membership):
+    """A'zoning guruhdagi o'rni (1 dan boshlab) - index bo'yicha sanash, saralashsiz"""
+    ahead = CohortMembership.objects.filter(cohort_id=membership.cohort_id).filter(
+        Q(xp__gt=membership.xp) | Q(xp=membership.xp, user_id__lt=membership.user_id)
+    ).count()
+    return ahead + 1
+
+
+def ranked_profiles(week_start):
+    """
+    Profillarni shu hafta XP si bo'yicha guruh (cohort) ichida tartiblaydi.
+    Guruhga kirmagan profillar liga bo'yicha bitta umumiy guruh hisoblanadi.
+    top_rank: yuqoridan o'rni, bottom_rank: pastdan o'rni (teng XP da avval ro'yxatdan o'tgan yuqorida).
+    """
+    week_xp = WeeklyStats.objects.filter(
+        user_id=OuterRef('user_id'),
+        start_date=week_start
+    ).values('xp_earned')[:1]
+    cohort = CohortMembership.objects.filter(
+        user_id=OuterRef('user_id'),
+        week_start_date=week_start
+    ).values('cohort_id')[:1]
+
+    return Profile.objects.annotate(
+        week_xp=Coalesce(Subquery(week_xp), Value(0)),
+        cohort_id=Subquery(cohort),
+    ).annotate(
+        top_rank=Window(
+            RowNumber(),
+            partition_by=[F('league'), F('cohort_id')],
+            order_by=[F('week_xp').desc(), F('user_id').asc()],
+        ),
+        bottom_rank=Window(
+            RowNumber(),
+            partition_by=[F('league'), F('cohort_id')],
+            order_by=[F('week_xp').asc(), F('user_id').desc()],
+        ),
+    )
+
+
+def compute_league_moves(week_start):
+    """
+    Kimlar ko'tarilishi va kimlar tushishini aniqlaydi.
+    Qoida: bir odam ham ko'tarilib, ham tusha olmaydi; XP si 0 bo'lgan odam ko'tarilmaydi.
+    Natija: {yangi_liga: [profile_id, ...]}
+    """
+    ranked = ranked_profiles(week_start)
+
+    promoted = dict(
+        ranked.filter(top_rank__lte=PROMOTE_COUNT, week_xp__gt=0)
+        .exclude(league=LEAGUES_ORDER[-1])
+        .values_list('id', 'league')
+    )
+    demoted = dict(
+        ranked.filter(bottom_rank__lte=DEMOTE_COUNT)
+        .exclude(league=LEAGUES_ORDER[0])
+        .values_list('id', 'league')
+    )
+
+    moves = {}
+    for profile_id, league in promoted.items():
+        next_league = LEAGUES_ORDER[LEAGUES_ORDER.index(league) + 1]
+        moves.setdefault(next_league, []).append(profile_id)
+    for profile_id, league in demoted.items():
+        if profile_id in promoted:
+            continue
+        prev_league = LEAGUES_ORDER[LEAGUES_ORDER.index(league) - 1]
+        moves.setdefault(prev_league, []).append(profile_id)
+    return moves
+
+
+def process_weekly_leagues(week_start=None):
+    """
+    O'tgan hafta natijalarini hisoblab, ligalarni yangilaydi.
+    Keyin yangi hafta uchun guruhlarni tuzadi.
+    Qayta ishlangan bo'lsa None, aks holda {yangi_liga: ko'chganlar_soni} qaytaradi.
+    """
+    week_start = week_start or last_week_start()
+
+    # Agar bu hafta uchun log allaqachon mavjud bo'lsa, qaytamiz (qayta ishlash shart emas)
+    if LeagueLog.objects.filter(week_start_date=week_start).exists():
+        return None
+
+    with transaction.atomic():
+        # Log avval yoziladi: unique bo'lgani uchun parallel jarayon shu yerda to'xtaydi
+        log, created = LeagueLog.objects.get_or_create(week_start_date=week_start)
+        if not created:
+            return None
+
+        moves = {}
+        # Hech kim o'ynamagan bo'lsa ham log yozib qo'yamiz, keyingi safar qayta tekshirmaslik uchun
+        if WeeklyStats.objects.filter(start_date=week_start).exists():
+            moves = compute_league_moves(week_start)
+            for league, profile_ids in moves.items():
+                Profile.objects.filter(id__in=profile_ids).update(league=league)
+
+        # Yangi liga tarkibi bo'yicha keyingi hafta guruhlari
+        assign_cohorts(week_start + timedelta(days=7))
+
+    return {league: len(profile_ids) for league, profile_ids in moves.items()}
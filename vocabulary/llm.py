@@ -0,0 +1,382 @@
+"""
+Gemini (generateContent) uchun server tomonidagi proksi.
+
+API kaliti brauzerga berilmaydi - so'rovlar /api/ai-chat/ orqali shu modul bilan yuboriladi:
+- keep-alive http.client ulanishlari pul da saqlanadi (har so'rovda yangi TLS handshake yo'q). Ulanish
+  so'rov davomida bitta so'rovga tegishli - javob oxirigacha o'qilgach pulga qaytadi, shuning uchun
+  stream boshqa thread larda o'qilsa ham (ASGI) ulanish boshqa so'rov bilan aralashmaydi;
+- stream=True bo'lsa javob streamGenerateContent?alt=sse dan bo'laklab o'qiladi. ASGI da
+  AsyncSSEEvents ishlatiladi: har bir bo'lak thread da o'qiladi va mijozga darhol uzatiladi
+  (sinxron iteratorni Django ASGI da oxirigacha yig'ib, keyin yuboradi);
+- deterministik so'rovlar (faqat matn, masalan so'z izohi) model + so'rov xeshi bo'yicha keshlanadi;
+- har foydalanuvchi uchun daqiqalik so'rov va kunlik token limiti (keshdagi hisoblagichlar).
+
+LLM_BASE_URL sozlanadi - testlarda mahalliy soxta server ko'rsatish mumkin.
+"""
+import asyncio
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .config import get_site_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta'
+DEFAULT_MODEL = 'gemini-2.5-flash'
+PAYLOAD_FIELDS = ('contents', 'system_instruction', 'generationConfig')
+# Keep-alive ulanish server tomonidan yopilgan bo'lsa so'rov bir marta qayta yuboriladi
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected, http.client.CannotSendRequest, http.client.ResponseNotReady,
+    ConnectionResetError, BrokenPipeError,
+)
+
+POOL_SIZE = 8 # bo'sh turadigan ulanishlar soni
+
+_pool = []
+_pool_target = None
+_pool_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    status = 502
+
+
+class BadRequest(LLMError):
+    status = 400
+
+
+class BudgetExceeded(LLMError):
+    status = 429
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting('LLM_CACHE', 'default')]
+
+
+def models():
+    """Ruxsat etilgan modellar: LLM_MODELS va admin da tanlangan model"""
+    allowed = tuple(_setting('LLM_MODELS', (DEFAULT_MODEL,)))
+    configured = get_site_config().ai_model
+    return allowed if not configured or configured in allowed else (configured, *allowed)
+
+
+def default_model():
+    return get_site_config().ai_model or _setting('LLM_DEFAULT_MODEL', DEFAULT_MODEL)
+
+
+def api_key():
+    return _setting('LLM_API_KEY', '') or get_site_config().gemini_api_key
+
+
+def build_payload(data):
+    """Brauzer yuborgan JSON dan faqat ruxsat etilgan maydonlar. `system` - oddiy matn ko'rinishida ham mumkin."""
+    if not isinstance(data.get('contents'), list) or not data['contents']:
+        raise BadRequest("contents bo'sh")
+    payload = {field: data[field] for field in PAYLOAD_FIELDS if data.get(field)}
+    if isinstance(data.get('system'), str) and data['system'].strip():
+        payload['system_instruction'] = {'parts': [{'text': data['system']}]}
+    return payload
+
+
+def is_deterministic(payload):
+    """Audio/rasm (inline_data) bo'lmagan so'rovlar - bir xil savolga bir xil javob keshlanadi"""
+    return not any(
+        'inline_data' in part or 'inlineData' in part
+        for content in payload.get('contents', ())
+        for part in content.get('parts', ())
+    )
+
+
+def cache_key(model, payload):
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return 'llm:reply:' + hashlib.sha256(f'{model}\n{raw}'.encode('utf-8')).hexdigest()
+
+
+# --- Limitlar ---
+
+def _rate_key(user):
+    return f'llm:rate:{user.pk}:{int(time.time() // 60)}'
+
+
+def _tokens_key(user):
+    return f'llm:tokens:{user.pk}:{timezone.localdate().isoformat()}'
+
+
+def check_budget(user):
+    """So'rovni hisobga oladi; limit oshgan bo'lsa BudgetExceeded"""
+    cache = _cache()
+    if cache.get(_tokens_key(user), 0) >= _setting('LLM_DAILY_TOKEN_BUDGET', 50000):
+        raise BudgetExceeded("Bugungi AI limiti tugadi. Ertaga qayta urinib ko'ring.")
+
+    key = _rate_key(user)
+    cache.add(key, 0, 120)
+    if cache.incr(key) > _setting('LLM_RATE_LIMIT', 10):
+        raise BudgetExceeded("Juda ko'p so'rov. Bir daqiqadan keyin urinib ko'ring.")
+
+
+def charge(user, tokens):
+    if not tokens:
+        return
+    cache = _cache()
+    key = _tokens_key(user)
+    cache.add(key, 0, 2 * 24 * 3600)
+    cache.incr(key, tokens)
+
+
+def _usage(data):
+    return (data.get('usageMetadata') or {}).get('totalTokenCount') or 0
+
+
+def _text(data):
+    candidates = data.get('candidates') or ()
+    if not candidates:
+        return ''
+    return ''.join(part.get('text', '') for part in (candidates[0].get('content') or {}).get('parts', ()))
+
+
+# --- HTTP ---
+
+def _acquire():
+    """Puldagi bo'sh ulanish (yoki yangisi) va yo'l prefiksi. LLM_BASE_URL o'zgarsa pul tozalanadi."""
+    global _pool_target
+    url = urlsplit(_setting('LLM_BASE_URL', DEFAULT_BASE_URL))
+    target = (url.scheme, url.netloc)
+    with _pool_lock:
+        if _pool_target != target:
+            while _pool:
+                _pool.pop().close()
+            _pool_target = target
+        connection = _pool.pop() if _pool else None
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(url.netloc, timeout=_setting('LLM_TIMEOUT', 60))
+        connection.target = target
+    return connection, url.path.rstrip('/')
+
+
+def _release(connection):
+    """Javobi to'liq o'qilgan ulanishni pulga qaytaradi"""
+    with _pool_lock:
+        if getattr(connection, 'target', None) == _pool_target and len(_pool) < POOL_SIZE:
+            _pool.append(connection)
+            return
+    connection.close()
+
+
+def _post(model, method, payload, query=''):
+    key = api_key()
+    if not key:
+        raise LLMError("AI kaliti sozlanmagan")
+    body = json.dumps(payload).encode('utf-8')
+    headers = {'Content-Type': 'application/json', 'x-goog-api-key': key}
+
+    for attempt in range(2):
+        connection, prefix = _acquire()
+        try:
+            connection.request('POST', f'{prefix}/models/{model}:{method}{query}', body=body, headers=headers)
+            response = connection.getresponse()
+            break
+        except STALE_CONNECTION_ERRORS:
+            connection.close()
+            if attempt:
+                raise LLMError("AI serveriga ulanib bo'lmadi")
+        except OSError as e:
+            connection.close()
+            raise LLMError(f"AI serveriga ulanib bo'lmadi: {e}")
+
+    if response.status != 200:
+        raw = response.read()
+        _release(connection)
+        try:
+            message = json.loads(raw)['error']['message']
+        except (ValueError, KeyError, TypeError):
+            message = f'HTTP {response.status}'
+        raise BadRequest(message) if response.status == 400 else LLMError(message)
+    return connection, response
+
+
+def generate(model, payload):
+    """(matn, token soni)"""
+    connection, response = _post(model, 'generateContent', payload)
+    try:
+        data = json.loads(response.read())
+    except (ValueError, OSError) as e:
+        connection.close()
+        raise LLMError(f"AI javobini o'qib bo'lmadi: {e}")
+    _release(connection)
+    return _text(data), _usage(data)
+
+
+class _SSEStream:
+    """
+    SSE qatorlaridan matn bo'laklari iteratori. Tugaganda yoki close() da (bir marta, hatto birinchi
+    next() dan oldin yopilsa ham) ulanish pulga qaytadi/yopiladi va on_done(matn, token soni, tugadimi).
+    """
+
+    def __init__(self, connection, response, on_done):
+        self._connection = connection
+        self._response = response
+        self._on_done = on_done
+        self._parts = []
+        self._tokens = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        try:
+            for line in self._response:
+                line = line.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                data = json.loads(line[5:])
+                self._tokens = _usage(data) or self._tokens
+                text = _text(data)
+                if text:
+                    self._parts.append(text)
+                    return text
+        except (ValueError, OSError) as e:
+            self._finish(False)
+            raise LLMError(f"AI javobini o'qib bo'lmadi: {e}")
+        self._finish(True)
+        raise StopIteration
+
+    def close(self):
+        self._finish(False)
+
+    def _finish(self, finished):
+        with self._lock: # close() boshqa thread dan ham chaqirilishi mumkin (ASGI)
+            if self._closed:
+                return
+            self._closed = True
+        if finished:
+            _release(self._connection)
+        else:
+            # Javob oxirigacha o'qilmadi - ulanishni qayta ishlatib bo'lmaydi
+            self._connection.close()
+        self._on_done(''.join(self._parts), self._tokens, finished)
+
+
+# --- Asosiy funksiyalar ---
+
+def complete(user, model, payload, use_cache=False):
+    """(matn, keshdanmi)"""
+    key = cache_key(model, payload) if use_cache and is_deterministic(payload) else None
+    if key:
+        cached = _cache().get(key)
+        if cached is not None:
+            return cached, True
+
+    check_budget(user)
+    text, tokens = generate(model, payload)
+    charge(user, tokens)
+    if key and text:
+        _cache().set(key, text, _setting('LLM_CACHE_TIMEOUT', 7 * 24 * 3600))
+    return text, False
+
+
+def complete_stream(user, model, payload, use_cache=False):
+    """
+    Matn bo'laklari iteratori. Limit va ulanish xatolari (LLMError) shu yerda, stream boshlanishidan
+    oldin chiqadi.
+    """
+    key = cache_key(model, payload) if use_cache and is_deterministic(payload) else None
+    if key:
+        cached = _cache().get(key)
+        if cached is not None:
+            return iter([cached])
+
+    check_budget(user)
+    connection, response = _post(model, 'streamGenerateContent', payload, '?alt=sse')
+
+    def on_done(text, tokens, finished):
+        charge(user, tokens)
+        if key and finished and text:
+            _cache().set(key, text, _setting('LLM_CACHE_TIMEOUT', 7 * 24 * 3600))
+
+    return _SSEStream(connection, response, on_done)
+
+
+def _sse_text(text):
+    return f'data: {json.dumps({"text": text}, ensure_ascii=False)}\n\n'
+
+
+def _sse_error(e):
+    logger.warning("LLM stream failed: %s", e)
+    return f'event: error\ndata: {json.dumps({"error": str(e)}, ensure_ascii=False)}\n\n'
+
+
+SSE_DONE = 'event: done\ndata: {}\n\n'
+
+
+def _events(chunks):
+    try:
+        for text in chunks:
+            yield _sse_text(text)
+    except LLMError as e:
+        yield _sse_error(e)
+        return
+    yield SSE_DONE
+
+
+async def _aiter_in_thread(iterator):
+    """Sinxron iteratorning har bir next() i thread da - event loop bloklanmaydi"""
+    iterator = iter(iterator)
+    end = object()
+    while (item := await asyncio.to_thread(next, iterator, end)) is not end:
+        yield item
+
+
+async def _aevents(chunks):
+    try:
+        async for text in _aiter_in_thread(chunks):
+            yield _sse_text(text)
+    except LLMError as e:
+        yield _sse_error(e)
+        return
+    yield SSE_DONE
+
+
+class SSEEvents:
+    """
+    Matn bo'laklarini brauzer uchun SSE hodisalariga aylantiradi (WSGI). StreamingHttpResponse
+    close() ni javob yopilganda chaqiradi - mijoz uzilsa (stream boshlanmagan bo'lsa ham) ulanish
+    yopiladi va ishlatilgan tokenlar hisobga olinadi.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return _events(self.chunks)
+
+    def close(self):
+        close = getattr(self.chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class AsyncSSEEvents(SSEEvents):
+    """SSEEvents ning ASGI varianti: bo'laklar kelishi bilan uzatiladi"""
+
+    __iter__ = None # faqat async iteratsiya
+
+    def __aiter__(self):
+        return _aevents(self.chunks)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from vocabulary.enrichment import enrich_words
+from vocabulary.models import Word
+
+
+class Command(BaseCommand):
+    help = "Tizim so'zlari uchun misollar, furigana, JLPT darajasi va eslab qolish usulini tayyorlaydi (WordEnrichment)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--book', type=int, action='append', default=[], help="Faqat shu kitob so'zlari")
+        parser.add_argument('--topic', type=int, action='append', default=[], help="Faqat shu mavzu so'zlari")
+        parser.add_argument('--limit', type=int, help="Ko'pi bilan shuncha (noyob) so'z tayyorlanadi")
+        parser.add_argument('--generator', help="Generator yo'li (standart: settings.ENRICHMENT_GENERATOR)")
+        parser.add_argument('--retry-failed', action='store_true', help="Avval xato bergan so'zlarni qayta urinish")
+        parser.add_argument('--force', action='store_true', help="Tayyorlarini ham qaytadan")
+
+    def handle(self, *args, **options):
+        words = Word.objects.filter(author__isnull=True)
+        if options['book'] or options['topic']:
+            through = Word.topics.through.objects.filter(topic__book__in=options['book']) | \
+                Word.topics.through.objects.filter(topic__in=options['topic'])
+            words = words.filter(id__in=through.values('word_id'))
+
+        result = enrich_words(
+            words,
+            generator=options['generator'],
+            force=options['force'],
+            retry_failed=options['retry_failed'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyorlandi: {result['generated']}, nusxa olindi: {result['copied']}, xato: {result['failed']}"
+        ))
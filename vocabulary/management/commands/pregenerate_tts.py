@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vocabulary.models import Book, Topic
+from vocabulary.tts_utils import VOICES
+from vocabulary.tts_warmup import warm_sync, DEFAULT_CONCURRENCY
+
+
+class Command(BaseCommand):
+    help = "Kitob yoki mavzu so'zlari uchun TTS audio ni oldindan tayyorlaydi (keshda borlari o'tkazib yuboriladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--book', type=int, action='append', default=[], help="Kitob id (bir necha marta berish mumkin)")
+        parser.add_argument('--topic', type=int, action='append', default=[], help="Mavzu id (bir necha marta berish mumkin)")
+        parser.add_argument('--voice', action='append', choices=VOICES, help="Standart: barcha ovozlar")
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Bir vaqtdagi sintezlar soni")
+        parser.add_argument('--synthesizer', help="async (text, voice) -> bytes funksiya yo'li (standart: settings.TTS_SYNTHESIZER)")
+
+    def handle(self, *args, **options):
+        books = list(Book.objects.filter(id__in=options['book']))
+        topics = list(Topic.objects.filter(id__in=options['topic']))
+        if not books and not topics:
+            raise CommandError("--book yoki --topic berilishi kerak")
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency kamida 1 bo'lishi kerak")
+
+        result, total = warm_sync(
+            books, topics,
+            voices=options['voice'] or VOICES,
+            synthesizer=options['synthesizer'],
+            concurrency=options['concurrency'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} ta so'z: yangi {result['created']}, keshda bor {result['skipped']}, xato {result['failed']}"
+        ))
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vocabulary.leagues import process_weekly_leagues, last_week_start
+
+
+class Command(BaseCommand):
+    help = "O'tgan hafta natijalari bo'yicha ligalarni yangilaydi (har Dushanba cron orqali ishga tushiring)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--week',
+            help="Hisoblanadigan haftaning Dushanbasi (YYYY-MM-DD). Standart: o'tgan hafta",
+        )
+
+    def handle(self, *args, **options):
+        week_start = last_week_start()
+        if options['week']:
+            try:
+                week_start = date.fromisoformat(options['week'])
+            except ValueError:
+                raise CommandError("Sana formati noto'g'ri, YYYY-MM-DD kerak")
+            if week_start.weekday() != 0:
+                raise CommandError("Sana Dushanba bo'lishi kerak")
+
+        result = process_weekly_leagues(week_start)
+        if result is None:
+            self.stdout.write(f"{week_start} haftasi allaqachon hisoblangan.")
+            return
+
+        moved = sum(result.values())
+        self.stdout.write(self.style.SUCCESS(f"{week_start} haftasi hisoblandi: {moved} ta profil ligasi o'zgardi."))
+        for league, count in sorted(result.items()):
+            self.stdout.write(f"  -> {league}: {count}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from vocabulary import search
+
+
+class Command(BaseCommand):
+    help = "Lug'at qidiruv indeksini (FTS5) noldan qayta quradi"
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write("Qidiruv indeksi faqat SQLite da ishlaydi, o'tkazib yuborildi.")
+            return
+        search.create_index()
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indekslandi: {total} ta so'z."))
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from vocabulary.scheduling import forecast_review_load
+
+
+class Command(BaseCommand):
+    help = "Keyingi kunlarda har kuni nechta so'z takrorlanishi kerakligini ko'rsatadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help="Necha kun oldinga (standart: 14)")
+        parser.add_argument('--user', help="Faqat shu foydalanuvchi uchun (username)")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Foydalanuvchi topilmadi: {options['user']}")
+
+        forecast = forecast_review_load(days=options['days'], user=user)
+        peak = max((count for _, count in forecast), default=0) or 1
+        for day, count in forecast:
+            bar = '#' * round(40 * count / peak)
+            self.stdout.write(f"{day.isoformat()}  {count:>7}  {bar}")
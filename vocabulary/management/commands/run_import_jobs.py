@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from vocabulary.import_jobs import recover_stale_jobs, run_job
+from vocabulary.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi Excel yuklash vazifalarini bajaradi (IMPORT_WORKERS = 0 bo'lsa cron orqali ishga tushiring)"
+
+    def handle(self, *args, **options):
+        for job_id in recover_stale_jobs():
+            self.stdout.write(self.style.WARNING(f"#{job_id}: to'xtab qolgan edi, qayta navbatga qo'yildi"))
+
+        job_ids = list(ImportJob.objects.filter(status='pending').order_by('id').values_list('id', flat=True))
+        if not job_ids:
+            self.stdout.write("Navbatda vazifa yo'q.")
+            return
+
+        for job_id in job_ids:
+            run_job(job_id)
+            job = ImportJob.objects.get(id=job_id)
+            style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+            self.stdout.write(style(f"#{job.id} {job.original_name}: {job.get_status_display()} ({job.processed_rows} qator, yangi: {job.created_words})"))
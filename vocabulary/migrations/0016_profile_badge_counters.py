@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:22
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_badge_counters(apps, schema_editor):
+    Profile = apps.get_model('vocabulary', 'Profile')
+    Word = apps.get_model('vocabulary', 'Word')
+    UserWordProgress = apps.get_model('vocabulary', 'UserWordProgress')
+    WeeklyStats = apps.get_model('vocabulary', 'WeeklyStats')
+
+    for profile in Profile.objects.all():
+        user = profile.user
+        profile.words_count = Word.objects.filter(author=user).count()
+        profile.books_count = user.saved_books.count()
+        profile.mastered_count = UserWordProgress.objects.filter(user=user, level__gte=5).count()
+        profile.correct_count = WeeklyStats.objects.filter(user=user).aggregate(total=Sum('correct_answers'))['total'] or 0
+        profile.save(update_fields=['words_count', 'books_count', 'mastered_count', 'correct_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0015_siteconfiguration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='books_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='correct_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='mastered_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='words_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_badge_counters, migrations.RunPython.noop),
+    ]
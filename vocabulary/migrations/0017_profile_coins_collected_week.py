@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0016_profile_badge_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='coins_collected_week',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0018_leaguecohort'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cohortmembership',
+            name='xp',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='cohortmembership',
+            index=models.Index(fields=['cohort', '-xp', 'user'], name='vocabulary__cohort__079aef_idx'),
+        ),
+    ]
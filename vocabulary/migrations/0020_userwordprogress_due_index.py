@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0019_cohortmembership_xp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userwordprogress',
+            index=models.Index(fields=['user', 'next_review_date'], name='vocabulary__user_id_282901_idx'),
+        ),
+    ]
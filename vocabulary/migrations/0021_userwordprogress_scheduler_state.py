@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0020_userwordprogress_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='difficulty',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='ease_factor',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='interval',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='lapses',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='last_review_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='repetitions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userwordprogress',
+            name='stability',
+            field=models.FloatField(default=0),
+        ),
+    ]
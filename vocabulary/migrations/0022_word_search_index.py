@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from vocabulary import search
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.create_index(schema_editor)
+
+    Word = apps.get_model('vocabulary', 'Word')
+    words = Word.objects.filter(author__isnull=True).values_list('id', 'japanese_word', 'hiragana', 'meaning')
+    with schema_editor.connection.cursor() as cursor:
+        search._write(cursor, (), list(words))
+
+
+def drop_search_index(apps, schema_editor):
+    from vocabulary import search
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0021_userwordprogress_scheduler_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
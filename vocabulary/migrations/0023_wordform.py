@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_word_forms(apps, schema_editor):
+    from vocabulary.kana import word_forms
+
+    Word = apps.get_model('vocabulary', 'Word')
+    WordForm = apps.get_model('vocabulary', 'WordForm')
+
+    batch = []
+    for word_id, japanese_word, hiragana in Word.objects.values_list('id', 'japanese_word', 'hiragana').iterator(chunk_size=2000):
+        batch.extend(WordForm(word_id=word_id, form=form) for form in word_forms(japanese_word, hiragana))
+        if len(batch) >= 5000:
+            WordForm.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    WordForm.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0022_word_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordForm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('form', models.CharField(db_index=True, max_length=255)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forms', to='vocabulary.word')),
+            ],
+            options={
+                'unique_together': {('word', 'form')},
+            },
+        ),
+        migrations.RunPython(fill_word_forms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0023_wordform'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(fields=['created_at', 'id'], name='vocabulary__created_f3ad72_idx'),
+        ),
+    ]
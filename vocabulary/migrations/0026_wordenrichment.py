@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0025_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordEnrichment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('examples', models.JSONField(blank=True, default=list)),
+                ('furigana', models.CharField(blank=True, max_length=255)),
+                ('jlpt_level', models.CharField(blank=True, choices=[('N5', 'N5'), ('N4', 'N4'), ('N3', 'N3'), ('N2', 'N2'), ('N1', 'N1')], max_length=2)),
+                ('mnemonic', models.TextField(blank=True)),
+                ('source', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('done', 'Tayyor'), ('failed', 'Xatolik')], default='done', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('word', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='enrichment', to='vocabulary.word')),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:52
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0026_wordenrichment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='ai_model',
+            field=models.CharField(default='gemini-2.5-flash', help_text='AI chat uchun standart Gemini modeli', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='daily_match_limit',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='daily_test_limit',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='daily_write_limit',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='pass_accuracy',
+            field=models.PositiveSmallIntegerField(default=60, validators=[django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='siteconfiguration',
+            name='tts_voice',
+            field=models.CharField(choices=[('ja-JP-NanamiNeural', 'Nanami (ayol)'), ('ja-JP-KeitaNeural', 'Keita (erkak)')], default='ja-JP-NanamiNeural', help_text='Standart TTS ovozi', max_length=50),
+        ),
+    ]
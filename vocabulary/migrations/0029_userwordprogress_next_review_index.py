@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0028_gamesession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userwordprogress',
+            index=models.Index(fields=['next_review_date'], name='vocabulary__next_re_c0e744_idx'),
+        ),
+    ]
@@ -4,10 +4,30 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
 
 # 0. SITE CONFIGURATION (Yangi)
+# Sozlamalar sahifalarda har so'rovda bazadan o'qilmaydi - vocabulary/config.py dagi keshdan olinadi
 class SiteConfiguration(models.Model):
+    TTS_VOICE_CHOICES = [
+        ('ja-JP-NanamiNeural', 'Nanami (ayol)'),
+        ('ja-JP-KeitaNeural', 'Keita (erkak)'),
+    ]
+
     gemini_api_key = models.CharField(max_length=255, default="", blank=True, help_text="Google Gemini API Key for AI Chat")
+    ai_model = models.CharField(max_length=100, default="gemini-2.5-flash", help_text="AI chat uchun standart Gemini modeli")
+    tts_voice = models.CharField(max_length=50, choices=TTS_VOICE_CHOICES, default='ja-JP-NanamiNeural', help_text="Standart TTS ovozi")
+
+    # O'yin limitlari: kuniga necha marta ball olish mumkin va ball uchun kerakli aniqlik (%)
+    daily_test_limit = models.PositiveSmallIntegerField(default=3)
+    daily_match_limit = models.PositiveSmallIntegerField(default=3)
+    daily_write_limit = models.PositiveSmallIntegerField(default=3)
+    pass_accuracy = models.PositiveSmallIntegerField(default=60, validators=[MaxValueValidator(100)])
+
+    @property
+    def daily_goal(self):
+        """Kunlik maqsad (3+3+3 = 9)"""
+        return self.daily_test_limit + self.daily_match_limit + self.daily_write_limit
 
     def save(self, *args, **kwargs):
         if not self.pk and SiteConfiguration.objects.exists():
@@ -63,6 +83,21 @@ class Word(models.Model):
     
     class Meta:
         verbose_name_plural = "Words"
+        indexes = [
+            models.Index(fields=['created_at', 'id']), # keyset sahifalash (pagination.py)
+        ]
+
+# 2.1 SO'Z SHAKLLARI - normallashtirilgan yozilishlar (hiragana/katakana, romaji, qavs ichidagi variantlar)
+# Qidiruv va yozish o'yinida javobni tekshirish uchun (vocabulary/kana.py, vocabulary/search.py)
+class WordForm(models.Model):
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='forms')
+    form = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        unique_together = ('word', 'form')
+
+    def __str__(self):
+        return f"{self.form} -> {self.word_id}"
 
 class Profile(models.Model):
     LEAGUE_CHOICES = [
@@ -88,7 +123,16 @@ class Profile(models.Model):
     coins = models.IntegerField(default=0)
     league = models.CharField(max_length=20, choices=LEAGUE_CHOICES, default='Bronze')
 
-    # Jami kunlik progressni hisoblaydigan property (3+3+3 = 9)
+    # Yutuqlar (Badges) uchun hisoblagichlar - o'zgarish bo'lgan joyda yangilanadi (badges.py)
+    words_count = models.IntegerField(default=0)    # Qo'shgan so'zlari soni
+    books_count = models.IntegerField(default=0)    # Saqlangan kitoblar soni
+    mastered_count = models.IntegerField(default=0) # Master qilingan so'zlar (Level 5+)
+    correct_count = models.IntegerField(default=0)  # Jami to'g'ri javoblar
+
+    # Oldingi haftalar tangalari qaysi hafta uchun yig'ib olingan (haftada bir marta tekshirish uchun)
+    coins_collected_week = models.DateField(null=True, blank=True)
+
+    # Jami kunlik progressni hisoblaydigan property (maqsad - SiteConfiguration.daily_goal)
     @property
     def total_daily_progress(self):
         return self.daily_test_count + self.daily_match_count + self.daily_write_count
@@ -133,8 +177,21 @@ class UserWordProgress(models.Model):
     level = models.IntegerField(default=1) # 1=Yangi, 2=Oson, 3=Yaxshi, 4=Zo'r, 5=Master
     next_review_date = models.DateField(default=timezone.now)
 
+    # Takrorlash rejalashtiruvchisi (scheduling.py) holati
+    interval = models.IntegerField(default=0)        # Oxirgi interval (kun)
+    repetitions = models.IntegerField(default=0)     # Ketma-ket to'g'ri javoblar (SM-2)
+    lapses = models.IntegerField(default=0)          # Necha marta unutilgan
+    ease_factor = models.FloatField(default=2.5)     # SM-2 osonlik koeffitsienti
+    stability = models.FloatField(default=0)         # FSRS: xotira barqarorligi (kun)
+    difficulty = models.FloatField(default=0)        # FSRS: qiyinlik (1-10)
+    last_review_date = models.DateField(null=True, blank=True)
+
     class Meta:
         unique_together = ('user', 'word')
+        indexes = [
+            models.Index(fields=['user', 'next_review_date']), # Takrorlash navbati (review_queue.py)
+            models.Index(fields=['next_review_date']), # Yuklamani tekislash (scheduling.py) - sana oralig'i bo'yicha
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.word.japanese_word} (Lvl: {self.level})"
@@ -147,6 +204,36 @@ class LeagueLog(models.Model):
     def __str__(self):
         return f"League Update for: {self.week_start_date}"
 
+# 5.1 LIGA GURUHLARI (Cohort) - har hafta har bir liga ~30 kishilik guruhlarga bo'linadi
+class LeagueCohort(models.Model):
+    league = models.CharField(max_length=20, choices=Profile.LEAGUE_CHOICES)
+    week_start_date = models.DateField() # Qaysi hafta uchun (Dushanba)
+    size = models.IntegerField(default=0) # A'zolar soni
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['week_start_date', 'league', 'size']),
+        ]
+
+    def __str__(self):
+        return f"{self.league} #{self.id} ({self.week_start_date})"
+
+class CohortMembership(models.Model):
+    cohort = models.ForeignKey(LeagueCohort, on_delete=models.CASCADE, related_name='members')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cohort_memberships')
+    week_start_date = models.DateField() # cohort.week_start_date bilan bir xil (bir haftada bitta guruh uchun)
+    xp = models.IntegerField(default=0) # Reyting uchun WeeklyStats.xp_earned nusxasi (XP o'zgarganda yangilanadi)
+
+    class Meta:
+        unique_together = ('user', 'week_start_date')
+        indexes = [
+            models.Index(fields=['cohort', '-xp', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} -> {self.cohort}"
+
 # 6. YUTUQLAR (BADGES) MODELI
 class Badge(models.Model):
     BADGE_TYPES = [
@@ -182,6 +269,120 @@ class UserBadge(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.badge.name}"
 
+# 7. EXCEL YUKLASH VAZIFALARI - katta fayllar fonda qismlab yuklanadi (vocabulary/import_jobs.py)
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('running', 'Yuklanmoqda'),
+        ('done', 'Tayyor'),
+        ('failed', 'Xatolik'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    topic = models.ForeignKey(Topic, on_delete=models.SET_NULL, null=True, blank=True) # Bo'sh bo'lsa - Topics ustuni
+    file_path = models.CharField(max_length=500) # settings.IMPORT_UPLOAD_DIR ichida
+    original_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+
+    total_rows = models.IntegerField(default=0) # Taxminiy (Excel dagi qatorlar soni)
+    processed_rows = models.IntegerField(default=0)
+    created_words = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0) # Jarayon to'xtab qolsa qayta urinishlar (import_jobs.recover_stale_jobs)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True) # Har qism yozilganda yangilanadi - to'xtab qolganini aniqlash uchun
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def percent(self):
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.processed_rows * 100 // self.total_rows)
+
+    def __str__(self):
+        return f"Import #{self.id} ({self.original_name}) - {self.status}"
+
+# O'YIN HOLATI - har bir faol o'yin (test / matching / yozish) uchun bitta qator (vocabulary/game_sessions.py)
+# Avval sessiyada saqlanardi: har bir javob butun django_session qatorini qayta yozardi
+class GameSession(models.Model):
+    GAME_CHOICES = [
+        ('test', 'Test'),
+        ('match', 'Matching'),
+        ('write', 'Yozish'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_sessions')
+    game = models.CharField(max_length=10, choices=GAME_CHOICES)
+    question_limit = models.PositiveSmallIntegerField(null=True, blank=True) # None - cheksiz
+    rounds = models.PositiveSmallIntegerField(default=0) # Matching raundlari
+
+    total_questions = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    wrong = models.PositiveIntegerField(default=0)
+    potential_coins = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+
+    # Natija sahifasi uchun (bazada saqlanmaydi)
+    saved = False
+    earned_coins = 0
+
+    class Meta:
+        unique_together = ('user', 'game')
+
+    @property
+    def limit(self):
+        """Shablonlar uchun: son yoki 'infinite'"""
+        return 'infinite' if self.question_limit is None else self.question_limit
+
+    @property
+    def remaining(self):
+        """Yana nechta javob qabul qilinadi (None - cheksiz)"""
+        if self.question_limit is None:
+            return None
+        return max(self.question_limit - self.total_questions, 0)
+
+    def to_json(self):
+        return {
+            'total_questions': self.total_questions,
+            'correct': self.correct,
+            'wrong': self.wrong,
+            'limit': self.limit,
+            'potential_coins': self.potential_coins,
+        }
+
+    def __str__(self):
+        return f"{self.user.username} - {self.game} ({self.total_questions})"
+
+# SO'Z BOYITISH - AI tayyorlagan misollar, furigana, JLPT darajasi va eslab qolish usuli
+# `python manage.py enrich_words` bilan to'ldiriladi (vocabulary/enrichment.py), sahifalarda so'rovsiz ko'rsatiladi
+class WordEnrichment(models.Model):
+    STATUS_CHOICES = [
+        ('done', 'Tayyor'),
+        ('failed', 'Xatolik'),
+    ]
+    JLPT_CHOICES = [(level, level) for level in ('N5', 'N4', 'N3', 'N2', 'N1')]
+
+    word = models.OneToOneField(Word, on_delete=models.CASCADE, related_name='enrichment')
+    # japanese_word/hiragana/meaning xeshi - so'z o'zgarsa qayta tayyorlanadi, bir xil so'zlar bir marta
+    content_hash = models.CharField(max_length=64, db_index=True)
+    examples = models.JSONField(default=list, blank=True) # [{"japanese": ..., "reading": ..., "meaning": ...}]
+    furigana = models.CharField(max_length=255, blank=True) # 学校[がっこう]
+    jlpt_level = models.CharField(max_length=2, choices=JLPT_CHOICES, blank=True)
+    mnemonic = models.TextField(blank=True)
+
+    source = models.CharField(max_length=100, blank=True) # generator nomi
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='done')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.word.japanese_word} - {self.status}"
+
 # 4. SIGNALLAR (Profilni avtomatik yaratish)
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -0,0 +1,148 @@
+"""
+Keyset (cursor) sahifalash.
+
+Paginator har sahifada COUNT(DISTINCT ...) va OFFSET qiladi - chuqur sahifalarda DB oldingi
+barcha qatorlarni o'qib chiqadi. Bu yerda sahifa (created_at, id) bo'yicha oxirgi ko'rilgan
+yozuvdan keyin boshlanadi: WHERE (created_at, id) > (...) ORDER BY created_at, id LIMIT n+1.
+
+Kursor - oxirgi/birinchi yozuvning (created_at, id) qiymati va yo'nalishi, base64 ko'rinishida.
+Jami son ixtiyoriy va taxminiy (approximate_count).
+"""
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+APPROXIMATE_COUNT_TIMEOUT = 300 # 5 daqiqa
+
+
+def encode_cursor(obj, direction):
+    data = json.dumps([obj.created_at.isoformat(), obj.pk, direction])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id, yo'nalish) yoki noto'g'ri kursor bo'lsa None"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(created_at)
+    except (ValueError, TypeError):
+        return None
+    if created_at is None or direction not in ('next', 'prev'):
+        return None
+    return created_at, int(pk), direction
+
+
+def approximate_count(queryset):
+    """
+    Taxminiy jami son. PostgreSQL da planner bahosi (EXPLAIN), boshqa bazalarda
+    aniq COUNT bir necha daqiqaga keshlanadi.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    key = 'vocabulary:count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def to_json(self, serialize):
+        return {
+            'results': [serialize(obj) for obj in self.object_list],
+            'next': self.next_cursor,
+            'previous': self.previous_cursor,
+            'count': self.count,
+        }
+
+
+class KeysetPaginator:
+    """
+    (created_at, id) bo'yicha sahifalash. `descending=True` - eng yangilari birinchi.
+    Queryset dublikatsiz bo'lishi kerak (distinct() o'rniga id__in subquery ishlating).
+    """
+
+    def __init__(self, queryset, per_page=20, descending=False, with_count=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.descending = descending
+        self.with_count = with_count
+
+    def _ordering(self, reverse):
+        desc = self.descending != reverse
+        return ('-created_at', '-id') if desc else ('created_at', 'id')
+
+    def _after(self, created_at, pk, reverse):
+        # "Keyingi" yozuvlar: tartib yo'nalishiga qarab katta yoki kichik
+        if self.descending != reverse:
+            return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+
+    def get_page(self, cursor=None):
+        position = decode_cursor(cursor)
+        reverse = position is not None and position[2] == 'prev'
+
+        qs = self.queryset.order_by(*self._ordering(reverse))
+        if position is not None:
+            qs = qs.filter(self._after(position[0], position[1], reverse))
+
+        rows = list(qs[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            # Orqaga qaytilgan bo'lsa, oldinda albatta sahifa bor
+            if (has_more and not reverse) or reverse:
+                next_cursor = encode_cursor(rows[-1], 'next')
+            if (has_more and reverse) or (position is not None and not reverse):
+                previous_cursor = encode_cursor(rows[0], 'prev')
+
+        count = approximate_count(self.queryset) if self.with_count else None
+        return KeysetPage(rows, next_cursor, previous_cursor, count)
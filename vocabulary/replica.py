@@ -0,0 +1,45 @@
+"""
+O'qish replikasi (DATABASES['replica'], DATABASE_REPLICA_URL) uchun router.
+
+Replika faqat aniq belgilangan joylarda ishlatiladi - lug'at sahifalari va liga reytingi:
+`@read_replica()` dekoratori yoki `with read_replica():` bloki ichidagi o'qishlar. Qolgan so'rovlar
+va barcha yozishlar asosiy bazaga boradi: replikadagi kechikish foydalanuvchi hozirgina yozgan
+ma'lumotni (javob, saqlangan so'z) "yo'qotib" qo'ymasligi uchun. Replika sozlanmagan bo'lsa hech narsa
+o'zgarmaydi.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def read_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Replikadan o'qilgan obyekt saqlansa ham asosiy bazaga yoziladi
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True # replika - asosiy bazaning nusxasi
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA # replika replikatsiya orqali yangilanadi
@@ -0,0 +1,79 @@
+"""
+Takrorlash navbati (Spaced Repetition).
+
+O'yinlar savol tanlash uchun foydalanuvchining butun lug'atini Python ga yuklamaydi:
+vaqti kelgan so'zlar (user, next_review_date) indeksi orqali to'g'ridan-to'g'ri DB dan olinadi,
+noto'g'ri variantlar esa COUNT + OFFSET bilan tasodifiy tanlanadi.
+"""
+import random
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Word, UserWordProgress
+
+# Vaqti kelgan eng eski so'zlardan nechtasi orasidan tasodifiy tanlanadi
+DUE_WINDOW = 20
+
+
+def vocabulary_words(user):
+    """Foydalanuvchi lug'ati: o'zi qo'shgan va saqlagan so'zlar (DISTINCT siz)"""
+    saved_ids = Word.saves.through.objects.filter(user=user).values('word_id')
+    return Word.objects.filter(Q(author=user) | Q(id__in=saved_ids))
+
+
+def vocabulary_count(user):
+    return vocabulary_words(user).count()
+
+
+def due_words(user, count=1, today=None):
+    """
+    Takrorlash vaqti kelgan so'zlar.
+    Eng eski DUE_WINDOW ta so'z orasidan `count` tasi tasodifiy tanlanadi.
+    """
+    today = today or timezone.now().date()
+    word_ids = list(
+        UserWordProgress.objects.filter(
+            user=user,
+            next_review_date__lte=today,
+            word__in=vocabulary_words(user),
+        ).order_by('next_review_date').values_list('word_id', flat=True)[:DUE_WINDOW]
+    )
+    if not word_ids:
+        return []
+
+    picked = random.sample(word_ids, min(count, len(word_ids)))
+    words = Word.objects.in_bulk(picked)
+    return [words[word_id] for word_id in picked if word_id in words]
+
+
+def random_words(user, count, exclude_ids=()):
+    """Lug'atdan tasodifiy so'zlar - lug'atni yuklamasdan (COUNT + OFFSET)"""
+    qs = vocabulary_words(user).exclude(id__in=exclude_ids).order_by('id')
+    total = qs.count()
+    return [qs[offset] for offset in random.sample(range(total), min(count, total))]
+
+
+def next_question(user, distractors=0):
+    """
+    Keyingi savol uchun so'z: avval vaqti kelganlar, bo'lmasa tasodifiy.
+    (so'z, [noto'g'ri variantlar]) qaytaradi.
+    """
+    due = due_words(user)
+    word = due[0] if due else random_words(user, 1)[0]
+    wrong = random_words(user, distractors, exclude_ids=[word.id]) if distractors else []
+    return word, wrong
+
+
+def next_questions(user, count, distractors=0):
+    """
+    `count` ta savol bir so'rovda (o'yin sahifasi oldindan yuklab oladi):
+    avval vaqti kelganlar, yetmasa tasodifiy. [(so'z, [noto'g'ri variantlar]), ...]
+    """
+    words = due_words(user, count)
+    if len(words) < count:
+        words += random_words(user, count - len(words), exclude_ids=[word.id for word in words])
+    return [
+        (word, random_words(user, distractors, exclude_ids=[word.id]) if distractors else [])
+        for word in words
+    ]
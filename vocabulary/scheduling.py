@@ -0,0 +1,250 @@
+"""
+Takrorlash rejalashtiruvchilari (Spaced Repetition Scheduler).
+
+update_word_progress va javoblar paketi (submit_answers_api) XP/Level ni apply_answer da
+hisoblaydi, keyingi takrorlash sanasini esa shu yerdagi rejalashtiruvchi belgilaydi:
+
+- 'ladder' - eski 1/3/7/14 kunlik zinapoya (apply_answer dagi sana o'zgarmaydi)
+- 'sm2'    - SuperMemo-2 (ease factor + interval)
+- 'fsrs'   - FSRS v4 (stability / difficulty, 90% eslab qolish maqsadi)
+
+settings.REVIEW_SCHEDULER orqali tanlanadi (standart - 'ladder', sm2/fsrs ni yoqish kerak).
+Paket numpy massivlarida birdaniga hisoblanadi. settings.REVIEW_LOAD_BALANCING yoqilgan bo'lsa, uzun
+intervallar ±5% oraliqda eng kam yuklangan kunga suriladi - serverdagi "cho'qqi" kunlar tekislanadi.
+Kunlik yuklama FORECAST_BLOCK kunlik bloklar bilan, faqat kerakli sanalar oralig'i uchun o'qiladi va
+settings.REVIEW_FORECAST_CACHE keshida saqlanadi (umumiy kesh berilsa worker lar bir-birinikini ishlatadi).
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import UserWordProgress
+
+MAX_INTERVAL = 365 # kun
+FORECAST_CACHE_TIMEOUT = 600 # 10 daqiqa
+FORECAST_BLOCK = 30 # kun - bitta so'rov/kesh kaliti qamrab oladigan sanalar
+
+
+def _rounds(progresses, answers):
+    """
+    Paketni bosqichlarga bo'ladi: bitta so'z paketda bir necha marta kelsa,
+    har bir bosqichda faqat bir marta qatnashadi (javoblar ketma-ketligi saqlanadi).
+    """
+    rounds = []
+    seen = {}
+    for progress, is_correct in zip(progresses, answers):
+        idx = seen.get(id(progress), 0)
+        seen[id(progress)] = idx + 1
+        if idx == len(rounds):
+            rounds.append(([], []))
+        rounds[idx][0].append(progress)
+        rounds[idx][1].append(is_correct)
+    return rounds
+
+
+class BaseScheduler:
+    name = None
+    fields = () # UserWordProgress da o'zgartiriladigan qo'shimcha maydonlar
+
+    def schedule(self, progress, is_correct, today):
+        self.schedule_batch([progress], [is_correct], today)
+
+    def schedule_batch(self, progresses, answers, today):
+        for rows, correct in _rounds(progresses, answers):
+            intervals = self._schedule_round(rows, np.array(correct, dtype=bool), today)
+            intervals = balance_intervals(intervals, today)
+            for progress, interval in zip(rows, intervals):
+                progress.interval = int(interval)
+                progress.next_review_date = today + timedelta(days=int(interval))
+                progress.last_review_date = today
+
+    def _schedule_round(self, rows, correct, today):
+        """Har bir so'z uchun holatni yangilaydi va yangi intervallarni (kun) qaytaradi"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _column(rows, field, dtype=float):
+        return np.array([getattr(p, field) for p in rows], dtype=dtype)
+
+    @staticmethod
+    def _store(rows, **columns):
+        for i, progress in enumerate(rows):
+            for field, values in columns.items():
+                setattr(progress, field, values[i].item())
+
+
+class LadderScheduler(BaseScheduler):
+    """Eski tizim: sana apply_answer da belgilanadi, bu yerda hech narsa o'zgarmaydi"""
+    name = 'ladder'
+
+    def schedule_batch(self, progresses, answers, today):
+        return
+
+
+class SM2Scheduler(BaseScheduler):
+    name = 'sm2'
+    fields = ('interval', 'repetitions', 'lapses', 'ease_factor', 'last_review_date')
+
+    # Bizda faqat to'g'ri/xato bor: to'g'ri = 4 ("yaxshi"), xato = 2 ("unutdim")
+    QUALITY_CORRECT = 4
+    QUALITY_WRONG = 2
+    MIN_EASE = 1.3
+
+    def _schedule_round(self, rows, correct, today):
+        ease = self._column(rows, 'ease_factor')
+        reps = self._column(rows, 'repetitions', int)
+        lapses = self._column(rows, 'lapses', int)
+        interval = self._column(rows, 'interval')
+
+        intervals = np.where(
+            reps == 0, 1,
+            np.where(reps == 1, 6, np.rint(np.maximum(interval, 1) * ease))
+        )
+        intervals = np.where(correct, intervals, 1)
+
+        q = np.where(correct, self.QUALITY_CORRECT, self.QUALITY_WRONG)
+        ease = np.maximum(self.MIN_EASE, ease + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02)))
+        reps = np.where(correct, reps + 1, 0)
+        lapses = lapses + (~correct).astype(int)
+
+        self._store(rows, ease_factor=ease, repetitions=reps, lapses=lapses)
+        return np.clip(intervals, 1, MAX_INTERVAL).astype(int)
+
+
+class FSRSScheduler(BaseScheduler):
+    name = 'fsrs'
+    fields = ('interval', 'lapses', 'stability', 'difficulty', 'last_review_date')
+
+    # FSRS v4 standart og'irliklari
+    W = np.array([
+        0.4, 0.6, 2.4, 5.8, 4.93, 0.94, 0.86, 0.01, 1.49,
+        0.14, 0.94, 2.18, 0.05, 0.34, 1.26, 0.29, 2.61,
+    ])
+    REQUEST_RETENTION = 0.9
+    GRADE_CORRECT = 3 # Good
+    GRADE_WRONG = 1   # Again
+
+    def _schedule_round(self, rows, correct, today):
+        w = self.W
+        stability = self._column(rows, 'stability')
+        difficulty = self._column(rows, 'difficulty')
+        lapses = self._column(rows, 'lapses', int)
+        elapsed = np.array(
+            [(today - p.last_review_date).days if p.last_review_date else 0 for p in rows],
+            dtype=float
+        )
+
+        grade = np.where(correct, self.GRADE_CORRECT, self.GRADE_WRONG)
+        is_new = stability <= 0
+        s = np.maximum(stability, 0.01)
+        d = np.clip(difficulty, 1, 10)
+        retrievability = 1 / (1 + elapsed / (9 * s))
+
+        # Qiyinlik: bahoga qarab o'zgaradi va boshlang'ich qiymatga qaytishga intiladi
+        init_d = np.clip(w[4] - (grade - 3) * w[5], 1, 10)
+        next_d = d - w[6] * (grade - 3)
+        next_d = np.clip(w[7] * w[4] + (1 - w[7]) * next_d, 1, 10)
+
+        # Barqarorlik: eslab qolsa o'sadi, unutsa tushadi
+        s_success = s * (
+            np.exp(w[8]) * (11 - d) * s ** (-w[9]) * (np.exp(w[10] * (1 - retrievability)) - 1) + 1
+        )
+        s_fail = w[11] * d ** (-w[12]) * ((s + 1) ** w[13] - 1) * np.exp(w[14] * (1 - retrievability))
+        next_s = np.where(correct, s_success, np.minimum(s_fail, s))
+
+        stability = np.where(is_new, w[grade - 1], next_s)
+        difficulty = np.where(is_new, init_d, next_d)
+        lapses = lapses + (~correct).astype(int)
+
+        self._store(rows, stability=stability, difficulty=difficulty, lapses=lapses)
+        intervals = stability * 9 * (1 / self.REQUEST_RETENTION - 1)
+        return np.clip(np.rint(intervals), 1, MAX_INTERVAL).astype(int)
+
+
+SCHEDULERS = {
+    scheduler.name: scheduler
+    for scheduler in (LadderScheduler, SM2Scheduler, FSRSScheduler)
+}
+
+
+def get_scheduler():
+    return SCHEDULERS[getattr(settings, 'REVIEW_SCHEDULER', 'ladder')]()
+
+
+def forecast_review_load(days=14, today=None, user=None):
+    """
+    Keyingi `days` kunda har kuni nechta so'z takrorlanishi kerakligini bashorat qiladi.
+    Muddati o'tgan so'zlar bugungi kunga qo'shiladi. [(sana, soni), ...] qaytaradi.
+    """
+    today = today or timezone.now().date()
+    end = today + timedelta(days=days - 1)
+
+    qs = UserWordProgress.objects.filter(next_review_date__lte=end)
+    if user is not None:
+        qs = qs.filter(user=user)
+
+    forecast = {today + timedelta(days=i): 0 for i in range(days)}
+    for row in qs.values('next_review_date').annotate(total=Count('id')):
+        forecast[max(row['next_review_date'], today)] += row['total']
+    return list(forecast.items())
+
+
+def _forecast_block(today, block):
+    """Bugundan keyingi block-chi FORECAST_BLOCK kunlik oraliq: {sana: soni} (faqat shu oraliq so'raladi)"""
+    cache = caches[getattr(settings, 'REVIEW_FORECAST_CACHE', 'default')]
+    key = f'vocabulary:review_forecast:{today.isoformat()}:{block}'
+    counts = cache.get(key)
+    if counts is None:
+        start = today + timedelta(days=block * FORECAST_BLOCK)
+        rows = UserWordProgress.objects.filter(
+            next_review_date__range=(start, start + timedelta(days=FORECAST_BLOCK - 1))
+        ).values('next_review_date').annotate(total=Count('id'))
+        counts = {row['next_review_date']: row['total'] for row in rows}
+        cache.set(key, counts, FORECAST_CACHE_TIMEOUT)
+    return counts
+
+
+def _forecast_window(today, first_day, last_day):
+    """today+first_day .. today+last_day kunlardagi takrorlashlar soni"""
+    forecast = {}
+    for block in range(first_day // FORECAST_BLOCK, last_day // FORECAST_BLOCK + 1):
+        forecast.update(_forecast_block(today, block))
+    return forecast
+
+
+def balance_intervals(intervals, today):
+    """
+    3 kundan uzun intervallarni ±5% (kamida ±1 kun) oraliqda
+    eng kam takrorlash rejalashtirilgan kunga suradi.
+    """
+    if not getattr(settings, 'REVIEW_LOAD_BALANCING', True):
+        return intervals
+    intervals = np.asarray(intervals)
+    if not (intervals >= 3).any():
+        return intervals
+
+    spread = np.maximum(1, np.rint(intervals * 0.05)).astype(int)
+    long_intervals = intervals >= 3
+    forecast = _forecast_window(
+        today,
+        max(1, int((intervals - spread)[long_intervals].min())),
+        min(MAX_INTERVAL, int((intervals + spread)[long_intervals].max())),
+    )
+
+    balanced = intervals.copy()
+    for i, interval in enumerate(intervals):
+        if interval < 3:
+            continue
+        candidates = range(max(1, interval - spread[i]), min(MAX_INTERVAL, interval + spread[i]) + 1)
+        balanced[i] = min(
+            candidates,
+            key=lambda days: (forecast.get(today + timedelta(days=days), 0), abs(days - interval))
+        )
+        # Bir paketdagi so'zlar bitta kunga yig'ilib qolmasligi uchun
+        day = today + timedelta(days=int(balanced[i]))
+        forecast[day] = forecast.get(day, 0) + 1
+    return balanced
@@ -0,0 +1,270 @@
+"""
+Lug'at bo'yicha to'liq matnli qidiruv (SQLite FTS5).
+
+Ikki xil indeks bor:
+
+1) WordForm jadvali - har bir so'zning normallashtirilgan shakllari (kana.py). Qaysi yozuvda
+   (kanji, hiragana, katakana, romaji, to'liq kenglik) kiritilmasin, oddiy B-tree indeks orqali
+   prefiks bo'yicha topiladi. Yozish o'yinida javob ham shu shakllar to'plami bilan tekshiriladi.
+
+2) Tizim so'zlari (author=None) ikkita FTS5 virtual jadvalda indekslanadi:
+- vocabulary_word_fts_ja      - japanese_word / hiragana, trigram tokenizer (kanji va kana so'z
+                                 chegarasiz yoziladi, shuning uchun 3 belgilik bo'laklar bo'yicha)
+- vocabulary_word_fts_meaning - meaning, unicode61 tokenizer (o'zbekcha so'zlar bo'yicha, prefiks bilan)
+
+Indekslar Word ning post_save / post_delete signallari orqali yangilanadi, FTS natijalari bm25
+bo'yicha saralanadi (shakl bo'yicha topilganlar birinchi). Hech qaysi indeks ishlatib bo'lmasa
+None qaytadi va view eski icontains qidiruviga qaytadi.
+"""
+import re
+
+from django.db import connection, transaction, DatabaseError
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .kana import normalize, word_forms, has_japanese
+from .models import Word, WordForm
+
+JA_TABLE = 'vocabulary_word_fts_ja'
+MEANING_TABLE = 'vocabulary_word_fts_meaning'
+
+TRIGRAM_MIN = 3   # trigram tokenizer bundan qisqa so'rovni topa olmaydi
+SEARCH_LIMIT = 500 # eng mos natijalardan nechtasi sahifalanadi
+
+# o'zbekcha tutuq belgilari: o'zbek / oʻzbek / o`zbek bir xil indekslanadi
+APOSTROPHES = re.compile(r"['`ʻʼ‘’]")
+WORD_RE = re.compile(r'\w+')
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def fold_meaning(text):
+    return APOSTROPHES.sub('', text or '').lower()
+
+
+def create_index(schema_editor=None):
+    """Virtual jadvallarni yaratadi (migratsiyadan chaqiriladi)"""
+    execute = schema_editor.execute if schema_editor else connection.cursor().execute
+    execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {JA_TABLE} "
+        f"USING fts5(japanese_word, hiragana, tokenize='trigram')"
+    )
+    execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {MEANING_TABLE} "
+        f"USING fts5(meaning, tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_index(schema_editor=None):
+    execute = schema_editor.execute if schema_editor else connection.cursor().execute
+    execute(f"DROP TABLE IF EXISTS {JA_TABLE}")
+    execute(f"DROP TABLE IF EXISTS {MEANING_TABLE}")
+
+
+def _rows(words):
+    ja_rows, meaning_rows = [], []
+    for word_id, japanese_word, hiragana, meaning in words:
+        ja_rows.append((word_id, japanese_word, hiragana or ''))
+        meaning_rows.append((word_id, fold_meaning(meaning)))
+    return ja_rows, meaning_rows
+
+
+def _write(cursor, ids, words=()):
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"DELETE FROM {JA_TABLE} WHERE rowid IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM {MEANING_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+    ja_rows, meaning_rows = _rows(words)
+    if ja_rows:
+        cursor.executemany(
+            f"INSERT INTO {JA_TABLE} (rowid, japanese_word, hiragana) VALUES (%s, %s, %s)", ja_rows
+        )
+        cursor.executemany(
+            f"INSERT INTO {MEANING_TABLE} (rowid, meaning) VALUES (%s, %s)", meaning_rows
+        )
+
+
+def index_words(word_ids):
+    """Berilgan so'zlarni indeksda yangilaydi (tizim so'zi bo'lmaganlari olib tashlanadi)"""
+    if not is_available() or not word_ids:
+        return
+    words = Word.objects.filter(id__in=word_ids, author__isnull=True).values_list(
+        'id', 'japanese_word', 'hiragana', 'meaning'
+    )
+    with connection.cursor() as cursor:
+        _write(cursor, word_ids, words)
+
+
+def remove_words(word_ids):
+    if not is_available() or not word_ids:
+        return
+    with connection.cursor() as cursor:
+        _write(cursor, word_ids)
+
+
+def rebuild_index():
+    """Indeksni noldan quradi. Indekslangan so'zlar sonini qaytaradi."""
+    if not is_available():
+        return 0
+    words = Word.objects.filter(author__isnull=True).values_list(
+        'id', 'japanese_word', 'hiragana', 'meaning'
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {JA_TABLE}")
+        cursor.execute(f"DELETE FROM {MEANING_TABLE}")
+        batch = []
+        for row in words.iterator(chunk_size=2000):
+            batch.append(row)
+            if len(batch) == 2000:
+                _write(cursor, (), batch)
+                total += len(batch)
+                batch = []
+        _write(cursor, (), batch)
+        total += len(batch)
+    return total
+
+
+def index_word_forms(words):
+    """
+    So'zlarning normallashtirilgan shakllarini qayta yozadi.
+    `words` - Word obyektlari yoki (id, japanese_word, hiragana) lar.
+    """
+    rows = [
+        (w.id, w.japanese_word, w.hiragana) if isinstance(w, Word) else tuple(w)
+        for w in words
+    ]
+    if not rows:
+        return
+    WordForm.objects.filter(word_id__in=[row[0] for row in rows]).delete()
+    WordForm.objects.bulk_create(
+        [
+            WordForm(word_id=word_id, form=form)
+            for word_id, japanese_word, hiragana in rows
+            for form in word_forms(japanese_word, hiragana)
+        ],
+        ignore_conflicts=True
+    )
+
+
+def answer_forms(word_ids):
+    """{word_id: {shakllar}} - yozish o'yinida javobni tekshirish uchun"""
+    forms = {word_id: set() for word_id in word_ids}
+    for word_id, form in WordForm.objects.filter(word_id__in=word_ids).values_list('word_id', 'form'):
+        forms[word_id].add(form)
+    return forms
+
+
+def is_valid_answer(answer, forms):
+    return normalize(answer) in forms
+
+
+def form_word_ids(query, limit=SEARCH_LIMIT, queryset=None):
+    """
+    Normallashtirilgan shakli `query` bilan boshlanadigan so'zlar (avval to'liq mos kelganlar).
+    `queryset` berilsa faqat shu so'zlar ichidan (limit filtrdan keyin qo'llanadi).
+    """
+    form = normalize(query)
+    if not form:
+        return []
+    # LIKE 'x%' o'rniga oraliq - har qanday bazada indeks ishlatiladi
+    forms = WordForm.objects.filter(form__gte=form, form__lt=form + '\U0010ffff')
+    if queryset is not None:
+        forms = forms.filter(word__in=queryset.order_by().values('id'))
+    word_ids = forms.order_by('form').values_list('word_id', flat=True)[:limit]
+    return list(dict.fromkeys(word_ids))
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_word_ids(query, limit=SEARCH_LIMIT, queryset=None):
+    """
+    bm25 bo'yicha saralangan so'z id lari (eng moslari birinchi).
+    `queryset` berilsa (masalan, mavzu bo'yicha) filtr FTS so'rovining o'ziga qo'shiladi -
+    LIMIT filtrlangan natijalarga qo'llanadi. Indeks ishlatib bo'lmasa None qaytaradi.
+    """
+    query = (query or '').strip()
+    if not is_available() or len(query) < TRIGRAM_MIN:
+        return None
+
+    restrict, restrict_params = '', []
+    if queryset is not None:
+        subquery, restrict_params = queryset.order_by().values('id').query.sql_with_params()
+        restrict = f" AND rowid IN ({subquery})"
+
+    parts = [
+        f"SELECT rowid AS id, bm25({JA_TABLE}, 2.0, 1.0) AS score FROM {JA_TABLE} "
+        f"WHERE {JA_TABLE} MATCH %s{restrict}"
+    ]
+    params = [_quote(query), *restrict_params]
+
+    tokens = WORD_RE.findall(fold_meaning(query))
+    if tokens:
+        parts.append(
+            f"SELECT rowid AS id, bm25({MEANING_TABLE}) AS score FROM {MEANING_TABLE} "
+            f"WHERE {MEANING_TABLE} MATCH %s{restrict}"
+        )
+        params += [' '.join(_quote(token) + '*' for token in tokens), *restrict_params]
+
+    sql = (
+        f"SELECT id FROM ({' UNION ALL '.join(parts)}) "
+        f"GROUP BY id ORDER BY MIN(score), id LIMIT %s"
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return [row[0] for row in cursor.fetchall()]
+    except DatabaseError:
+        # Indeks hali yaratilmagan (masalan, migratsiya qilinmagan)
+        return None
+
+
+def search_words(queryset, query, limit=SEARCH_LIMIT):
+    """
+    `queryset` (masalan, mavzu bo'yicha filtrlangan) ichidan qidiradi.
+    Saralangan id lar ro'yxatini yoki None qaytaradi.
+    """
+    # Filtr ikkala qidiruvning ichida - LIMIT dan oldin (aks holda mavzudagi so'zlar umumiy top-N ga
+    # kirmay qolishi mumkin)
+    form_ids = form_word_ids(query, limit, queryset)
+    ranked_ids = search_word_ids(query, limit, queryset)
+    if ranked_ids is None and (not form_ids or not has_japanese(query)):
+        # Qisqa lotincha so'rov ma'nolar ichidan ham qidirilishi kerak
+        return None
+
+    return list(dict.fromkeys(form_ids + (ranked_ids or [])))[:limit]
+
+
+def _sync(word_ids, words=()):
+    """Signal ichida: indeks xatosi so'zni saqlashga xalaqit bermasligi kerak"""
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            _write(cursor, word_ids, words)
+    except DatabaseError:
+        pass
+
+
+@receiver(post_save, sender=Word)
+def sync_word_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_word_forms([instance])
+    if not is_available():
+        return
+    words = []
+    if instance.author_id is None:
+        words = [(instance.id, instance.japanese_word, instance.hiragana, instance.meaning)]
+    _sync([instance.id], words)
+
+
+@receiver(post_delete, sender=Word)
+def drop_word_index(sender, instance, **kwargs):
+    if is_available():
+        _sync([instance.id])
@@ -0,0 +1,118 @@
+"""
+TTS audio keshi (diskda, kontent bo'yicha manzillangan).
+
+Kalit - normallashtirilgan matn va ovoz nomining sha256 xeshi; fayl TTS_CACHE_DIR/ab/<kalit>.mp3
+ko'rinishida saqlanadi. Bir xil so'z ikkinchi marta sintez qilinmaydi - faqat fayl o'qiladi.
+Kalit ETag sifatida ham ishlatiladi (kontent o'zgarmaydi).
+
+Hajm TTS_CACHE_MAX_BYTES dan oshsa, eng uzoq vaqt eshitilmagan fayllar (mtime bo'yicha LRU)
+o'chiriladi - har safar fayl keshdan berilganda uning mtime yangilanadi.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+
+from django.conf import settings
+
+SPACES = re.compile(r'\s+')
+EVICT_TO = 0.9 # tozalashdan keyin limitning 90% i qoladi
+
+_lock = threading.Lock()
+_total_size = None # jarayondagi taxminiy hajm (birinchi murojaatda hisoblanadi)
+
+
+def _cache_dir():
+    return str(getattr(settings, 'TTS_CACHE_DIR', os.path.join(settings.BASE_DIR, 'tts_cache')))
+
+
+def _max_bytes():
+    return getattr(settings, 'TTS_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+
+def normalize_text(text):
+    return SPACES.sub(' ', unicodedata.normalize('NFKC', text or '')).strip()
+
+
+def cache_key(text, voice):
+    return hashlib.sha256(f'{voice}\n{normalize_text(text)}'.encode('utf-8')).hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(_cache_dir(), key[:2], f'{key}.mp3')
+
+
+def get(key):
+    """Keshdagi fayl yo'li yoki None. Topilsa LRU uchun mtime yangilanadi."""
+    path = cache_path(key)
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def put(key, data):
+    """Audio ni atomik yozadi (vaqtinchalik fayl + os.replace) va kerak bo'lsa eskilarini o'chiradi"""
+    global _total_size
+    path = cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    with _lock:
+        if _total_size is None:
+            _total_size = _scan_size()
+        else:
+            _total_size += len(data)
+        if _total_size > _max_bytes():
+            _total_size = _evict(int(_max_bytes() * EVICT_TO))
+    return path
+
+
+def _entries():
+    root = _cache_dir()
+    if not os.path.isdir(root):
+        return
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith('.mp3'):
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+
+def _scan_size():
+    return sum(size for _, size, _ in _entries())
+
+
+def _evict(target):
+    """Hajm `target` dan oshmaguncha eng eski fayllarni o'chiradi. Yangi hajmni qaytaradi."""
+    entries = sorted(_entries(), key=lambda entry: entry[2])
+    total = sum(size for _, size, _ in entries)
+    for path, size, _ in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+
+def get_or_create(text, voice, synthesize):
+    """
+    (fayl yo'li, kalit) qaytaradi. Keshda bo'lmasa synthesize(text, voice) -> bytes chaqiriladi.
+    """
+    key = cache_key(text, voice)
+    path = get(key)
+    if path is None:
+        path = put(key, synthesize(normalize_text(text), voice))
+    return path, key
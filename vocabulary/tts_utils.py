@@ -1,25 +1,50 @@
 import asyncio
 import edge_tts
 import io
+import weakref
+
+from django.conf import settings
 
 # Valid voices:
 # ja-JP-NanamiNeural (Female)
 # ja-JP-KeitaNeural (Male)
+VOICES = ("ja-JP-NanamiNeural", "ja-JP-KeitaNeural")
+DEFAULT_VOICE = VOICES[0]
+
+async def stream_edge_audio(text, voice="ja-JP-NanamiNeural"):
+    """
+    Yields MP3 audio chunks as they arrive from Edge TTS.
+    """
+    communicate = edge_tts.Communicate(text, voice)
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
 
 async def generate_edge_audio(text, voice="ja-JP-NanamiNeural"):
     """
     Generates MP3 audio bytes for the given text using Edge TTS.
     """
-    communicate = edge_tts.Communicate(text, voice)
     audio_stream = io.BytesIO()
 
-    async for chunk in communicate.stream():
-        if chunk["type"] == "audio":
-            audio_stream.write(chunk["data"])
+    async for chunk in stream_edge_audio(text, voice):
+        audio_stream.write(chunk)
 
     audio_stream.seek(0)
     return audio_stream.read()
 
+_semaphores = weakref.WeakKeyDictionary()
+
+def synthesis_semaphore():
+    """
+    Limits concurrent Edge TTS syntheses (settings.TTS_MAX_CONCURRENCY) on the running event loop.
+    One semaphore per loop: under WSGI every async request gets its own loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(getattr(settings, 'TTS_MAX_CONCURRENCY', 4))
+    return semaphore
+
 def get_edge_audio_sync(text, voice="ja-JP-NanamiNeural"):
     """
     Synchronous wrapper for generating Edge TTS audio.
@@ -0,0 +1,118 @@
+"""
+Kitob/mavzu so'zlari uchun TTS audio ni oldindan tayyorlash (keshni "isitish").
+
+Har bir so'z (qavs ichidagi o'qilishsiz - brauzerdagi speak() kabi) va har bir ovoz uchun audio
+tts_cache ga yoziladi; keshda borlari o'tkazib yuboriladi. Sintezlar asyncio semafori bilan
+cheklangan parallel ishlaydi.
+
+Sintezator almashtiriladi: settings.TTS_SYNTHESIZER (yoki buyruqdagi --synthesizer) -
+async (text, voice) -> bytes funksiyaning to'liq yo'li. Testlarda soxta sintezator berish mumkin.
+
+Admin amali vazifani o'zining thread pool ida (TTS_WARMUP_WORKERS) bajaradi - Excel yuklash navbatini
+band qilmaydi. TTS_WARMUP_WORKERS = 0 bo'lsa so'rov ichida bajariladi.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from . import tts_cache
+from .kana import PARENS
+from .models import Word
+from .tts_utils import VOICES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNTHESIZER = 'vocabulary.tts_utils.generate_edge_audio'
+DEFAULT_CONCURRENCY = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_synthesizer(path=None):
+    return import_string(path or getattr(settings, 'TTS_SYNTHESIZER', DEFAULT_SYNTHESIZER))
+
+
+def speech_text(japanese_word):
+    """'学校 (がっこう)' -> '学校' (base.html dagi speak() bilan bir xil)"""
+    return PARENS.sub('', japanese_word or '').strip()
+
+
+def texts_for(books=(), topics=()):
+    """Kitob va mavzulardagi tizim so'zlari matnlari (takrorlarsiz)"""
+    through = Word.topics.through.objects.filter(word__author__isnull=True)
+    words = through.filter(topic__book__in=books) | through.filter(topic__in=topics)
+    texts = (speech_text(w) for w in words.values_list('word__japanese_word', flat=True).distinct().iterator())
+    return sorted({text for text in texts if text})
+
+
+async def warm(texts, voices=VOICES, synthesize=None, concurrency=DEFAULT_CONCURRENCY):
+    """{'created', 'skipped', 'failed'} qaytaradi"""
+    synthesize = synthesize or get_synthesizer()
+    semaphore = asyncio.Semaphore(concurrency)
+    result = {'created': 0, 'skipped': 0, 'failed': 0}
+
+    async def one(text, voice):
+        key = tts_cache.cache_key(text, voice)
+        if await asyncio.to_thread(tts_cache.get, key) is not None:
+            result['skipped'] += 1
+            return
+        async with semaphore:
+            try:
+                data = await synthesize(tts_cache.normalize_text(text), voice)
+            except Exception:
+                logger.exception("TTS failed: %s (%s)", text, voice)
+                result['failed'] += 1
+                return
+        if not data:
+            result['failed'] += 1
+            return
+        await asyncio.to_thread(tts_cache.put, key, data)
+        result['created'] += 1
+
+    await asyncio.gather(*(one(text, voice) for text in texts for voice in voices))
+    return result
+
+
+def warm_sync(books=(), topics=(), voices=VOICES, synthesizer=None, concurrency=DEFAULT_CONCURRENCY):
+    """Sinxron koddan (buyruq, admin) chaqirish uchun"""
+    texts = texts_for(books, topics)
+    return asyncio.run(warm(texts, voices, get_synthesizer(synthesizer), concurrency)), len(texts)
+
+
+def _workers():
+    return getattr(settings, 'TTS_WARMUP_WORKERS', 1)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix='tts-warmup')
+        return _executor
+
+
+def _warm_task(books, topics):
+    close_old_connections()
+    try:
+        return warm_sync(books, topics)
+    except Exception:
+        logger.exception("TTS warm-up failed")
+    finally:
+        close_old_connections()
+
+
+def warm_in_background(books=(), topics=()):
+    """
+    Fonda boshlaydi va None qaytaradi. TTS_WARMUP_WORKERS = 0 bo'lsa shu yerning o'zida bajarib,
+    warm_sync natijasini qaytaradi.
+    """
+    if _workers() <= 0:
+        return warm_sync(books, topics)
+    _get_executor().submit(_warm_task, books, topics)
+    return None
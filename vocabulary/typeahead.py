@@ -0,0 +1,136 @@
+"""
+Yozish paytida qidiruv (typeahead) uchun xotiradagi prefiks indeks.
+
+Tizim so'zlarining (author=None) barcha kalitlari - normallashtirilgan shakllar (kana.py) va
+ma'nodagi so'zlar - bitta saralangan massivda saqlanadi va bisect bilan prefiks bo'yicha
+qidiriladi. Oxirgi so'rovlar natijasi LRU keshda turadi.
+
+Indeks Word o'zgarganda (post_save / post_delete, tranzaksiya tugagach) bekor qilinadi va keyingi
+so'rovda qayta quriladi. Versiya settings.TYPEAHEAD_INDEX_CACHE keshida (standart - 'shared') saqlanadi
+va bir nechta worker bir-biriga mos holatda qoladi (BadgeCatalog kabi).
+"""
+import threading
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .kana import normalize, word_forms
+from .models import Word
+from .search import fold_meaning, WORD_RE
+
+INDEX_VERSION_KEY = 'vocabulary:typeahead:version'
+RESULT_CACHE_SIZE = 512
+MAX_RESULTS = 20
+
+
+def _meaning_keys(meaning):
+    folded = fold_meaning(meaning)
+    keys = {normalize(part) for part in folded.split(',')}
+    keys.update(WORD_RE.findall(folded))
+    return {key for key in keys if key}
+
+
+class TypeaheadIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None # (saralangan kalitlar, ularga mos word_id lar, {word_id: so'z})
+        self._version = None
+        self._results = OrderedDict()
+
+    def _shared_cache(self):
+        alias = getattr(settings, 'TYPEAHEAD_INDEX_CACHE', None)
+        return caches[alias] if alias else None
+
+    def _build(self):
+        entries = []
+        words = {}
+        rows = Word.objects.filter(author__isnull=True).values_list('id', 'japanese_word', 'hiragana', 'meaning')
+        for word_id, japanese_word, hiragana, meaning in rows.iterator(chunk_size=2000):
+            words[word_id] = (japanese_word, hiragana or '', meaning)
+            for key in word_forms(japanese_word, hiragana) | _meaning_keys(meaning):
+                entries.append((key, word_id))
+        entries.sort()
+        return [key for key, _ in entries], [word_id for _, word_id in entries], words
+
+    def _load(self):
+        shared = self._shared_cache()
+        version = shared.get(INDEX_VERSION_KEY) if shared else None
+        data = self._data
+        if data is not None and version == self._version:
+            return data
+
+        with self._lock:
+            if self._data is None or version != self._version:
+                self._data = self._build()
+                self._version = version
+                self._results = OrderedDict()
+            return self._data
+
+    def contains(self, word_id):
+        data = self._data
+        return data is None or word_id in data[2]
+
+    def search(self, query, limit=MAX_RESULTS):
+        """`query` bilan boshlanadigan so'zlar (to'liq mos kelganlar birinchi)"""
+        prefix = normalize(fold_meaning(query))
+        if not prefix:
+            return []
+        keys, ids, words = self._load()
+
+        cache_key = (prefix, limit)
+        with self._lock:
+            if cache_key in self._results:
+                self._results.move_to_end(cache_key)
+                return self._results[cache_key]
+
+        found = []
+        seen = set()
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(found) < limit:
+            word_id = ids[i]
+            if word_id not in seen:
+                seen.add(word_id)
+                japanese_word, hiragana, meaning = words[word_id]
+                found.append({
+                    'id': word_id,
+                    'japanese_word': japanese_word,
+                    'hiragana': hiragana,
+                    'meaning': meaning,
+                })
+            i += 1
+
+        with self._lock:
+            if self._data is None or self._data[0] is not keys:
+                return found # indeks shu orada yangilangan - eski natijani keshlamaymiz
+            self._results[cache_key] = found
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return found
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+            self._results = OrderedDict()
+        shared = self._shared_cache()
+        if shared:
+            shared.set(INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+index = TypeaheadIndex()
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+def invalidate_typeahead_index(sender, instance, raw=False, **kwargs):
+    # Foydalanuvchi qo'shgan so'zlar indeksda yo'q - ular uchun qayta qurish shart emas
+    if raw or (instance.author_id is not None and not index.contains(instance.id)):
+        return
+    # Commit dan keyin - aks holda boshqa so'rov indeksni eski ma'lumotdan qayta qurib qo'yishi mumkin
+    transaction.on_commit(index.invalidate)
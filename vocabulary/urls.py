@@ -9,6 +9,7 @@ urlpatterns = [
     
     # 2. Darslik Lug'ati (Hamma so'zlar)
     path('dictionary/', views.dashboard, name='dashboard'), 
+    path('api/search/', views.search_api, name='search_api'), # Yozish paytida qidiruv (typeahead)
     
     # 3. Shaxsiy Lug'at va Profil
     path('my-vocabulary/', views.my_vocabulary, name='my_vocabulary'),
@@ -28,6 +29,9 @@ urlpatterns = [
     path('topic/<int:topic_id>/', views.topic_words, name='topic_words'),
     path('books/<int:book_id>/', views.book_details_view, name='book_details'),
     path('books/save/<int:book_id>/', views.toggle_book_save, name='toggle_book_save'),
+    path('books/<int:book_id>/export/', views.export_book, name='export_book'), # ?format=csv|xlsx|anki
+    path('topic/<int:topic_id>/export/', views.export_topic, name='export_topic'),
+    path('my-vocabulary/export/', views.export_my_vocabulary, name='export_my_vocabulary'),
     # vocabulary/urls.py ga qo'shing
     path('save_all_topic/<int:topic_id>/', views.save_all_topic_words, name='save_all_topic_words'),
     path('quiz/', views.quiz_home, name='quiz_home'),
@@ -46,9 +50,13 @@ urlpatterns = [
     path('games/write/start/', views.write_start, name='write_start'),    # Boshlash
     path('games/write/play/', views.write_play, name='write_play'),       # O'yin jarayoni
     path('games/write/result/', views.write_result, name='write_result'), # Natija
+    path('api/games/answers/', views.submit_answers_api, name='submit_answers_api'), # Javoblarni to'plab yuborish
+    path('api/games/questions/', views.game_questions_api, name='game_questions_api'), # Savollarni oldindan olish
     path('upload-words/', views.upload_words, name='upload_words'),
     path('upload-book-words/', views.upload_book_words, name='upload_book_words'),
+    path('api/import-jobs/<int:job_id>/', views.import_job_status, name='import_job_status'), # Yuklash progressi
     path('ai-chat/', views.ai_chat_view, name='ai_chat'),
     path('ai-chat-test/', views.ai_chat_test_view, name='ai_chat_test'),
+    path('api/ai-chat/', views.ai_chat_api, name='ai_chat_api'),
     path('api/tts/', views.edge_tts_view, name='edge_tts_api'),
 ]
\ No newline at end of file
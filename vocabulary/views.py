@@ -1,23 +1,39 @@
+import asyncio
 import random
-import re
 import json
 from datetime import timedelta
-import pandas as pd
 
+from django.conf import settings
 from django.utils import timezone
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.db import models
 from django.db.models import Q
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.contrib.admin.views.decorators import staff_member_required
 
-from .models import Word, Profile, Topic, WeeklyStats, UserWordProgress, Book, LeagueLog, Badge, UserBadge, SiteConfiguration
+from .models import Word, Profile, Topic, WeeklyStats, UserWordProgress, Book, UserBadge, ImportJob
 from .forms import UserRegisterForm, WordForm
-from .tts_utils import get_edge_audio_sync
+from . import llm, tts_cache
+from . import game_sessions
+from .config import get_site_config, site_config
+from .tts_utils import stream_edge_audio, synthesis_semaphore, VOICES, DEFAULT_VOICE
+from .badges import award_badges, bump_counter, catalog as badge_catalog
+from .counters import increment_weekly_stats, increment_profile
+from .scheduling import get_scheduler
+from .exports import export_response, book_rows, topic_rows, user_rows
+from .import_jobs import start_import, job_status
+from .pagination import KeysetPaginator
+from .search import search_words, answer_forms, is_valid_answer
+from .typeahead import index as typeahead_index, MAX_RESULTS as TYPEAHEAD_MAX_RESULTS
+from .review_queue import vocabulary_words, vocabulary_count, next_question, next_questions
+from .leagues import process_weekly_leagues, get_user_membership, cohort_leaderboard, cohort_rank
+from .replica import read_replica
 from django.http import HttpResponse
 
 # =========================================================
@@ -25,66 +41,13 @@ from django.http import HttpResponse
 # DIQQAT: Bularning tepasiga @login_required QO'YMANG!
 # =========================================================
 
-def check_badges(user):
+def apply_answer(progress, is_correct, today):
     """
-    Foydalanuvchining yutuqlarini tekshirish va berish.
-    Bu funksiya har safar muhim harakat (so'z qo'shish, o'yin o'ynash) bo'lganda chaqiriladi.
+    Bitta javobni UserWordProgress obyektiga qo'llaydi (saqlamaydi).
+    Haftalik XP o'zgarishini qaytaradi (+1 yoki -2).
     """
-    # 1. So'zlar soni bo'yicha (words)
-    word_count = Word.objects.filter(author=user).count()
-    word_badges = Badge.objects.filter(badge_type='words', threshold__lte=word_count)
-
-    for badge in word_badges:
-        UserBadge.objects.get_or_create(user=user, badge=badge)
-
-    # 2. Streak bo'yicha (streak)
-    if hasattr(user, 'profile'):
-        streak_count = user.profile.streak
-        streak_badges = Badge.objects.filter(badge_type='streak', threshold__lte=streak_count)
-        for badge in streak_badges:
-            UserBadge.objects.get_or_create(user=user, badge=badge)
-
-    # 3. Liga bo'yicha (future) - buni process_weekly_leagues da chaqirish mumkin
-
-    # 4. Yangi Badge Turlari (Mergan, Boyvachcha, Kitobxon, Poliglot)
-
-    # Boyvachcha (Coins)
-    if hasattr(user, 'profile'):
-        coins = user.profile.coins
-        coin_badges = Badge.objects.filter(badge_type='coins', threshold__lte=coins)
-        for badge in coin_badges:
-            UserBadge.objects.get_or_create(user=user, badge=badge)
-
-    # Kitobxon (Saved Books)
-    saved_books_count = user.saved_books.count()
-    book_badges = Badge.objects.filter(badge_type='books', threshold__lte=saved_books_count)
-    for badge in book_badges:
-        UserBadge.objects.get_or_create(user=user, badge=badge)
-
-    # Poliglot (Mastered Words - Level 5)
-    mastered_count = UserWordProgress.objects.filter(user=user, level__gte=5).count()
-    master_badges = Badge.objects.filter(badge_type='master', threshold__lte=mastered_count)
-    for badge in master_badges:
-        UserBadge.objects.get_or_create(user=user, badge=badge)
-
-    # Mergan (Weekly Correct Answers)
-    # Bu biroz murakkab, chunki bizda "Total Correct" yo'q. Hozircha WeeklyStats dan foydalanamiz
-    # Yoki joriy hafta uchun tekshiramiz. Agar "Total" kerak bo'lsa, WeeklyStats larni yig'ish kerak.
-    # Keling, WeeklyStats larni yig'ib chiqamiz (Lifetime Correct Answers).
-    total_correct = WeeklyStats.objects.filter(user=user).aggregate(total=models.Sum('correct_answers'))['total'] or 0
-    sniper_badges = Badge.objects.filter(badge_type='correct', threshold__lte=total_correct)
-    for badge in sniper_badges:
-        UserBadge.objects.get_or_create(user=user, badge=badge)
-
-
-def update_word_progress(user, word, is_correct):
-    """So'zning progressini yangilash (XP va Level)"""
-    progress, created = UserWordProgress.objects.get_or_create(user=user, word=word)
-    weekly_stats = get_weekly_stats(user)
-
     if is_correct:
         progress.xp += 1
-        weekly_stats.xp_earned += 1 # XP qo'shish
 
         # Level Up logikasi: har 4 xp da 1 level
         if progress.xp >= 4:
@@ -92,50 +55,101 @@ def update_word_progress(user, word, is_correct):
             progress.xp = 0
             # Keyingi takrorlash sanasi (hozircha oddiy mantiq)
             days_to_add = 3 if progress.level == 2 else 7 if progress.level == 3 else 14
-            progress.next_review_date = timezone.now().date() + timedelta(days=days_to_add)
-    else:
-        # Jarima: -2 xp
-        progress.xp -= 2
-        weekly_stats.xp_earned -= 2 # XP ayirish
-        if weekly_stats.xp_earned < 0:
-            weekly_stats.xp_earned = 0 # Haftalik XP 0 dan tushib ketmasligi kerak
-
-        if progress.xp < 0:
-            if progress.level > 1:
-                progress.level -= 1 # Level tushadi
-                progress.xp = 2 # Oldingi levelning o'rtasiga tushadi
-            else:
-                progress.xp = 0 # 1-leveldan pastga tushmaydi
+            progress.next_review_date = today + timedelta(days=days_to_add)
+        return 1
+
+    # Jarima: -2 xp
+    progress.xp -= 2
+    if progress.xp < 0:
+        if progress.level > 1:
+            progress.level -= 1 # Level tushadi
+            progress.xp = 2 # Oldingi levelning o'rtasiga tushadi
+        else:
+            progress.xp = 0 # 1-leveldan pastga tushmaydi
 
-        # Xato qilsa, ertaga yana qaytarish kerak
-        progress.next_review_date = timezone.now().date() + timedelta(days=1)
+    # Xato qilsa, ertaga yana qaytarish kerak
+    progress.next_review_date = today + timedelta(days=1)
+    return -2
 
-    progress.save()
-    weekly_stats.save()
+def update_word_progress(user, word, is_correct):
+    """So'zning progressini yangilash (XP va Level)"""
+    progress, created = UserWordProgress.objects.get_or_create(user=user, word=word)
+    weekly_stats = get_weekly_stats(user)
+    was_mastered = progress.level >= 5
 
-def get_weekly_stats(user):
-    """Joriy hafta uchun statistika obyektini qaytaradi yoki yaratadi"""
     today = timezone.now().date()
-    start_week = today - timedelta(days=today.weekday()) # Dushanba
-
-    # 1. Oldingi haftalarning yig'ilmagan tangalarini tekshirish
+    xp_delta = apply_answer(progress, is_correct, today)
+
+    # Keyingi takrorlash sanasi - tanlangan rejalashtiruvchi bo'yicha (scheduling.py)
+    scheduler = get_scheduler()
+    scheduler.schedule(progress, is_correct, today)
+    progress.save(update_fields=['xp', 'level', 'next_review_date', *scheduler.fields])
+    # Haftalik XP 0 dan tushib ketmasligi kerak (counters.py da)
+    increment_weekly_stats(weekly_stats, xp_earned=xp_delta)
+
+    # Poliglot (Master so'zlar) hisoblagichi
+    is_mastered = progress.level >= 5
+    if is_mastered != was_mastered:
+        bump_counter(user, 'master', 1 if is_mastered else -1)
+
+def word_to_json(word):
+    """JSON mijozlar (format=json) uchun so'z ma'lumotlari"""
+    data = {
+        'id': word.id,
+        'japanese_word': word.japanese_word,
+        'hiragana': word.hiragana or '',
+        'meaning': word.meaning,
+        'created_at': word.created_at.isoformat(),
+    }
+    progress = getattr(word, 'user_progress', None)
+    if progress is not None:
+        data['level'] = progress.level
+        data['next_review_date'] = progress.next_review_date.isoformat()
+    return data
+
+def get_week_start(today=None):
+    """Joriy haftaning birinchi kuni (Dushanba)"""
+    today = today or timezone.now().date()
+    return today - timedelta(days=today.weekday())
+
+def collect_previous_weeks_coins(user):
+    """Oldingi haftalarning yig'ilmagan tangalarini balansga o'tkazadi"""
     uncollected_stats = WeeklyStats.objects.filter(
         user=user,
-        start_date__lt=start_week,
+        start_date__lt=get_week_start(),
         is_collected=False
     )
 
-    if uncollected_stats.exists():
-        total_coins = 0
-        for stat in uncollected_stats:
-            total_coins += stat.coins_earned
-            stat.is_collected = True
-            stat.save()
+    total_coins = 0
+    for stat_id, coins_earned in uncollected_stats.values_list('id', 'coins_earned'):
+        # Faqat shu so'rov "yig'ildi" deb belgilagan bo'lsa tangalarni qo'shamiz (ikki marta qo'shilmasligi uchun)
+        if WeeklyStats.objects.filter(id=stat_id, is_collected=False).update(is_collected=True):
+            total_coins += coins_earned
+
+    if total_coins > 0:
+        profile = increment_profile(user.profile, coins=total_coins)
+        award_badges(user, 'coins', profile.coins, previous=profile.coins - total_coins)
+
+def get_weekly_stats(user):
+    """
+    Joriy hafta uchun statistika obyektini qaytaradi yoki yaratadi.
+    Natija user obyektida (ya'ni shu request davomida) saqlanadi - bir so'rov ichida qayta chaqirilsa DB ga bormaydi.
+    """
+    start_week = get_week_start()
+
+    cached = getattr(user, '_weekly_stats_cache', None)
+    if cached is not None and cached.start_date == start_week:
+        return cached
 
-        if total_coins > 0:
-            profile = user.profile
-            profile.coins += total_coins
-            profile.save()
+    # 1. Oldingi haftalarning tangalari - haftada bir marta (Profile dagi belgi orqali)
+    profile = user.profile
+    if profile.coins_collected_week != start_week:
+        claimed = Profile.objects.filter(pk=profile.pk).exclude(
+            coins_collected_week=start_week
+        ).update(coins_collected_week=start_week)
+        profile.coins_collected_week = start_week
+        if claimed:
+            collect_previous_weeks_coins(user)
 
     # 2. Joriy hafta statistikasini olish
     stats, created = WeeklyStats.objects.get_or_create(
@@ -143,6 +157,7 @@ def get_weekly_stats(user):
         start_date=start_week,
         defaults={'end_date': start_week + timedelta(days=6)}
     )
+    user._weekly_stats_cache = stats
     return stats
 
 def check_daily_progress(user):
@@ -162,136 +177,30 @@ def check_daily_progress(user):
              profile.daily_test_count = 0
              profile.daily_match_count = 0
              profile.daily_write_count = 0
-             profile.save() # Reset qilinganini saqlash kerak
+             profile.save(update_fields=['daily_test_count', 'daily_match_count', 'daily_write_count']) # Reset qilinganini saqlash kerak
 
     # Jarima tizimi (Streak)
     if profile.last_login_date and profile.last_login_date < yesterday:
         profile.streak = 0
         profile.tree_state = 3
-        profile.save()
+        profile.save(update_fields=['streak', 'tree_state'])
 
 def check_streak_update(profile):
     """
     O'yin tugagandan keyin chaqiriladi.
     """
-    total_score = profile.daily_test_count + profile.daily_match_count + profile.daily_write_count
-    
-    if total_score == 9:
+    # Limitlar admin da kamaytirilgan bo'lishi mumkin - shuning uchun >=
+    if profile.total_daily_progress >= get_site_config().daily_goal:
         today = timezone.now().date()
         if profile.last_login_date != today:
             profile.streak += 1
             profile.tree_state = 1
             profile.last_login_date = today
-            profile.save()
+            profile.save(update_fields=['streak', 'tree_state', 'last_login_date'])
+            award_badges(profile.user, 'streak', profile.streak, previous=profile.streak - 1)
             return True
     return False
 
-def process_weekly_leagues():
-    """
-    O'tgan hafta natijalarini hisoblab, ligalarni yangilaydi.
-    """
-    today = timezone.now().date()
-    start_of_current_week = today - timedelta(days=today.weekday()) # Bu Dushanba
-    start_of_last_week = start_of_current_week - timedelta(days=7) # O'tgan Dushanba
-
-    # Agar bu hafta uchun log allaqachon mavjud bo'lsa, qaytamiz (qayta ishlash shart emas)
-    if LeagueLog.objects.filter(week_start_date=start_of_last_week).exists():
-        return
-
-    with transaction.atomic():
-        # Qayta tekshirish (Race condition oldini olish uchun)
-        if LeagueLog.objects.select_for_update().filter(week_start_date=start_of_last_week).exists():
-            return
-
-        # 1. O'tgan hafta statistikasini olamiz
-        last_week_stats = WeeklyStats.objects.filter(start_date=start_of_last_week)
-
-        if not last_week_stats.exists():
-            # Hech kim o'ynamagan bo'lsa ham log yozib qo'yamiz, keyingi safar qayta tekshirmaslik uchun
-            LeagueLog.objects.create(week_start_date=start_of_last_week)
-            return
-
-        # 2. Barcha profillarni olamiz
-        # Profillarni bloklab turamiz (select_for_update), shunda bir vaqtning o'zida ikkita jarayon o'zgartira olmaydi
-        profiles = list(Profile.objects.select_for_update().all())
-        league_groups = {
-            'Bronze': [], 'Silver': [], 'Gold': [], 'Platinum': [], 'Diamond': []
-        }
-
-        # Profillarni guruhlaymiz va XP sini bog'laymiz
-        user_xp_map = {stat.user_id: stat.xp_earned for stat in last_week_stats}
-
-        for p in profiles:
-            xp = user_xp_map.get(p.user.id, 0)
-            league_groups[p.league].append({'profile': p, 'xp': xp})
-
-        # 3. Har bir liga bo'yicha hisob-kitob (Promote/Demote)
-        leagues_order = ['Bronze', 'Silver', 'Gold', 'Platinum', 'Diamond']
-
-        for i, league_name in enumerate(leagues_order):
-            group = league_groups[league_name]
-            # XP bo'yicha kamayish tartibida saralaymiz
-            group.sort(key=lambda x: x['xp'], reverse=True)
-
-            count = len(group)
-            if count == 0: continue
-
-            # Kimlar ko'tariladi va kimlar tushadi?
-            # Qoida: Bir odam ham ko'tarilib, ham tusha olmaydi.
-            # Shuning uchun avval Promotion ro'yxatini aniqlaymiz, keyin qolganlardan Demotion ni.
-
-            promoted_indices = set()
-
-            # --- PROMOTION (Yuqoriga chiqish) ---
-            if i < len(leagues_order) - 1:
-                next_league = leagues_order[i + 1]
-                # Top 5 kishi ko'tariladi
-                promoted_users = group[:5]
-                for idx, item in enumerate(promoted_users):
-                    # Faqat XP si 0 dan katta bo'lsa ko'tariladi
-                    if item['xp'] > 0:
-                        item['profile'].league = next_league
-                        item['profile'].save()
-                        promoted_indices.add(idx)
-
-            # --- DEMOTION (Pastga tushish) ---
-            if i > 0:
-                prev_league = leagues_order[i - 1]
-                # Bottom 5 kishi tushadi, LEKIN Promoted bo'lganlar bundan mustasno
-                # Agar guruhda 5 kishidan kam bo'lsa, hech kim tushmaydi.
-                # Agar guruhda 10 kishidan kam bo'lsa (masalan 6 kishi), va Top 5 ko'tarilsa,
-                # 6-odam tushadimi?
-                # User talabi: Top 5 ko'tariladi, Bottom 5 tushadi.
-                # Agar 6 kishi bo'lsa: 1-5 ko'tariladi. 6-chi odam (Bottom 1) tushadi.
-                # Agar 5 kishi bo'lsa: 1-5 ko'tariladi. Hech kim tushmaydi (chunki ular Top 5 da).
-
-                # Demak, biz ro'yxatning oxiridan 5 ta odamni olamiz.
-                # Agar o'sha odam 'promoted_indices' da bo'lsa, uni tushirmaymiz.
-
-                potential_demotions = group[-5:] if count >= 5 else group # Oxirgi 5 ta (yoki boricha)
-
-                # Lekin aniq index bo'yicha ishlashimiz kerak, chunki potential_demotions bu yangi list
-                # Shuning uchun butun group bo'yicha aylanamiz
-
-                # Quyidan 5 tasini sanaymiz
-                demotion_candidates_count = 0
-                for idx in range(count - 1, -1, -1): # Oxiridan boshga qarab
-                    if demotion_candidates_count >= 5:
-                        break
-
-                    # Agar bu odam allaqachon ko'tarilgan bo'lsa, unga tegmaymiz
-                    if idx in promoted_indices:
-                        continue
-
-                    # Aks holda, bu odam tushish zonasida
-                    item = group[idx]
-                    item['profile'].league = prev_league
-                    item['profile'].save()
-                    demotion_candidates_count += 1
-
-        # Log yozib qo'yamiz
-        LeagueLog.objects.create(week_start_date=start_of_last_week)
-
 # =========================================================
 # 2. ASOSIY SAHIFALAR (VIEWLAR)
 # Bularga @login_required KERAK
@@ -300,10 +209,9 @@ def process_weekly_leagues():
 @login_required
 def home(request):
     check_daily_progress(request.user)
-    check_badges(request.user) # Badge tekshirish
 
     try:
-        created_count = Word.objects.filter(author=request.user).count()
+        created_count = request.user.profile.words_count
         saved_count = request.user.saved_words.count()
     except AttributeError:
         created_count = 0
@@ -319,25 +227,44 @@ def home(request):
     return render(request, 'vocabulary/home.html', context)
 
 @login_required
+@read_replica() # faqat o'qish - replika sozlangan bo'lsa shundan
 def dashboard(request):
     query = request.GET.get('q')
     topic_filter = request.GET.get('topic')
-    words = Word.objects.filter(author__isnull=True)
+    words = Word.objects.filter(author__isnull=True).select_related('enrichment')
     topics = Topic.objects.all()
-    
-    if query:
-        words = words.filter(
-            Q(japanese_word__icontains=query) | 
-            Q(hiragana__icontains=query) | 
-            Q(meaning__icontains=query)
-        )
-    if topic_filter:
-        words = words.filter(topics__name=topic_filter)
-    
-    words = words.order_by('created_at').distinct()
-    paginator = Paginator(words, 20)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+
+    if topic_filter:
+        # JOIN + DISTINCT o'rniga subquery - keyset sahifalash uchun dublikatsiz
+        words = words.filter(id__in=Word.topics.through.objects.filter(topic__name=topic_filter).values('word_id'))
+
+    # FTS indeksi bo'yicha saralangan natijalar (None - indeks ishlatib bo'lmaydi)
+    ranked_ids = search_words(words, query) if query else None
+
+    if ranked_ids is not None:
+        paginator = Paginator(ranked_ids, 20)
+        page_obj = paginator.get_page(page_number)
+        page_words = Word.objects.select_related('enrichment').in_bulk(page_obj.object_list)
+        page_obj.object_list = [page_words[word_id] for word_id in page_obj.object_list if word_id in page_words]
+    else:
+        if query:
+            words = words.filter(
+                Q(japanese_word__icontains=query) | 
+                Q(hiragana__icontains=query) | 
+                Q(meaning__icontains=query)
+            )
+        page_obj = KeysetPaginator(words, 20, with_count=True).get_page(request.GET.get('cursor'))
+
+    if request.GET.get('format') == 'json':
+        if getattr(page_obj, 'is_keyset', False):
+            return JsonResponse(page_obj.to_json(word_to_json))
+        return JsonResponse({
+            'results': [word_to_json(word) for word in page_obj.object_list],
+            'page': page_obj.number,
+            'num_pages': page_obj.paginator.num_pages,
+            'count': page_obj.paginator.count,
+        })
 
     context = {
         'words': page_obj,
@@ -347,27 +274,37 @@ def dashboard(request):
     }
     return render(request, 'vocabulary/dashboard.html', context)
 
+@login_required
+def search_api(request):
+    """Lug'atdan prefiks bo'yicha qidiruv (typeahead): /api/search/?q=...&limit=10"""
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), TYPEAHEAD_MAX_RESULTS)
+    except ValueError:
+        limit = 10
+    return JsonResponse({'query': query, 'results': typeahead_index.search(query, limit)})
+
 @login_required
 def my_vocabulary(request):
-    progress_map = {
-        p.word_id: p for p in UserWordProgress.objects.filter(user=request.user)
-    }
-    user_words_qs = Word.objects.filter(author=request.user).order_by('-created_at')
-    saved_words_qs = request.user.saved_words.all().order_by('-created_at')
+    user_words_qs = Word.objects.filter(author=request.user)
+    saved_words_qs = request.user.saved_words.all()
     saved_books_qs = request.user.saved_books.all().order_by('-created_at')
 
-    user_paginator = Paginator(user_words_qs, 20)
-    user_page_number = request.GET.get('user_page')
-    user_words = user_paginator.get_page(user_page_number)
-    for word in user_words:
-        word.user_progress = progress_map.get(word.id)
+    user_words = KeysetPaginator(user_words_qs, 20, descending=True).get_page(request.GET.get('user_cursor'))
+    saved_words = KeysetPaginator(saved_words_qs, 20, descending=True).get_page(request.GET.get('saved_cursor'))
 
-    saved_paginator = Paginator(saved_words_qs, 20)
-    saved_page_number = request.GET.get('saved_page')
-    saved_words = saved_paginator.get_page(saved_page_number)
-    for word in saved_words:
+    # Faqat sahifadagi so'zlar progressi
+    page_ids = [word.id for word in user_words] + [word.id for word in saved_words]
+    progress_map = {
+        p.word_id: p for p in UserWordProgress.objects.filter(user=request.user, word_id__in=page_ids)
+    }
+    for word in list(user_words) + list(saved_words):
         word.user_progress = progress_map.get(word.id)
 
+    if request.GET.get('format') == 'json':
+        page = saved_words if request.GET.get('list') == 'saved' else user_words
+        return JsonResponse(page.to_json(word_to_json))
+
     return render(request, 'vocabulary/my_vocabulary.html', {
         'user_words': user_words,
         'saved_words': saved_words,
@@ -407,6 +344,23 @@ def book_details_view(request, book_id):
         'is_saved': is_saved
     })
 
+@login_required
+def export_book(request, book_id):
+    """Kitob so'zlarini yuklab olish: ?format=csv|xlsx|anki"""
+    book = get_object_or_404(Book, id=book_id)
+    return export_response(book_rows(book), request.GET.get('format', 'csv'), f'book-{book.id}')
+
+@login_required
+def export_topic(request, topic_id):
+    topic = get_object_or_404(Topic, id=topic_id)
+    return export_response(topic_rows(topic), request.GET.get('format', 'csv'), f'topic-{topic.id}')
+
+@login_required
+def export_my_vocabulary(request):
+    """?list=created|saved|all"""
+    which = request.GET.get('list', 'all')
+    return export_response(user_rows(request.user, which), request.GET.get('format', 'csv'), f'my-vocabulary-{which}')
+
 @login_required
 def toggle_book_save(request, book_id):
     book = get_object_or_404(Book, id=book_id)
@@ -416,16 +370,21 @@ def toggle_book_save(request, book_id):
     else:
         book.saves.add(request.user)
         saved = True
+    bump_counter(request.user, 'books', 1 if saved else -1) # Kitobxon
     return JsonResponse({'saved': saved})
 
 @login_required
 def topic_words(request, topic_id):
-    topic = get_object_or_404(Topic, id=topic_id)
-    words_qs = Word.objects.filter(author__isnull=True, topics=topic).order_by('created_at').distinct()
-    paginator = Paginator(words_qs, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
+    # Lug'at replikadan o'qiladi; saqlangan so'zlar holati esa asosiy bazadan (hozirgina saqlangan bo'lishi mumkin)
+    with read_replica():
+        topic = get_object_or_404(Topic, id=topic_id)
+        # Bitta mavzu bo'yicha JOIN dublikat bermaydi (word, topic juftligi unique) - distinct() kerak emas
+        words_qs = Word.objects.filter(author__isnull=True, topics=topic)
+        page_obj = KeysetPaginator(words_qs.select_related('enrichment'), 20, with_count=True).get_page(request.GET.get('cursor'))
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse(page_obj.to_json(word_to_json))
+
     words_all_saved = True
     saved_ids = request.user.saved_words.values_list('id', flat=True)
     has_unsaved = words_qs.exclude(id__in=saved_ids).exists()
@@ -453,18 +412,14 @@ def save_all_topic_words(request, topic_id):
         for word in new_words_to_add:
             word.saves.add(request.user)
         if count_new > 0:
-            stats = get_weekly_stats(request.user)
-            stats.words_learned += count_new
-            stats.save()
+            increment_weekly_stats(get_weekly_stats(request.user), words_learned=count_new)
         saved = True
     else:
         count_removed = words.count()
         for word in words:
             word.saves.remove(request.user)
         if count_removed > 0:
-            stats = get_weekly_stats(request.user)
-            stats.words_learned -= count_removed
-            stats.save()
+            increment_weekly_stats(get_weekly_stats(request.user), words_learned=-count_removed)
         saved = False 
     return JsonResponse({'saved': saved})
 
@@ -480,11 +435,9 @@ def add_word(request):
             word = form.save(commit=False)
             word.author = request.user
             word.save()
-            stats = get_weekly_stats(request.user)
-            stats.words_learned += 1
-            stats.save()
+            increment_weekly_stats(get_weekly_stats(request.user), words_learned=1)
 
-            check_badges(request.user) # Badge tekshirish (Ilk qadam)
+            bump_counter(request.user, 'words') # Badge tekshirish (Ilk qadam)
 
             return redirect('my_vocabulary')
     else:
@@ -500,21 +453,18 @@ def toggle_save(request, word_id):
     if request.user in word.saves.all():
         word.saves.remove(request.user)
         saved = False
-        stats = get_weekly_stats(request.user)
-        stats.words_learned -= 1
-        stats.save()
+        increment_weekly_stats(get_weekly_stats(request.user), words_learned=-1)
     else:
         word.saves.add(request.user)
         saved = True
-        stats = get_weekly_stats(request.user)
-        stats.words_learned += 1
-        stats.save()
+        increment_weekly_stats(get_weekly_stats(request.user), words_learned=1)
     return JsonResponse({'saved': saved})
 
 @login_required
 def delete_word(request, word_id):
     word = get_object_or_404(Word, id=word_id, author=request.user)
     word.delete()
+    bump_counter(request.user, 'words', -1)
     return redirect('my_vocabulary')
 
 # =========================================================
@@ -523,12 +473,11 @@ def delete_word(request, word_id):
 
 @login_required
 def profile_view(request):
-    check_badges(request.user)
     weekly_stats = get_weekly_stats(request.user)
 
     # Barcha nishonlar va foydalanuvchi olgan nishonlar
-    all_badges = Badge.objects.all().order_by('threshold')
-    user_badges_ids = UserBadge.objects.filter(user=request.user).values_list('badge_id', flat=True)
+    all_badges = badge_catalog.all()
+    user_badges_ids = set(UserBadge.objects.filter(user=request.user).values_list('badge_id', flat=True))
 
     # Shablon uchun ma'lumot tayyorlash
     badges_display = []
@@ -548,7 +497,9 @@ def profile_view(request):
 def leagues_view(request):
     """Yangi LIGALAR sahifasi"""
     # 1. Haftalik hisob-kitobni tekshirish (Lazy execution)
-    process_weekly_leagues()
+    # Asosiy yo'l - `manage.py process_leagues` (cron). Bu yerda faqat zaxira sifatida (standart o'chiq).
+    if getattr(settings, 'LEAGUES_LAZY_PROCESSING', False):
+        process_weekly_leagues()
 
     # Userning league statusi process_weekly_leagues da o'zgargan bo'lishi mumkin
     # Lekin request.user keshlanib qolgan bo'lishi mumkin, shuning uchun yangilaymiz
@@ -560,39 +511,20 @@ def leagues_view(request):
 
     current_league = user_profile.league
 
-    # 2. Shu ligadagi foydalanuvchilarni olish
-    profiles_in_league = Profile.objects.filter(league=current_league).select_related('user')
+    # 2. Foydalanuvchining shu haftadagi guruhi (cohort) - butun liga emas, ~30 kishi
+    membership = get_user_membership(request.user)
 
-    # 3. Joriy haftalik XP bo'yicha saralash
-    # Buning uchun har bir profilga uning joriy haftalik statistikasini bog'laymiz
-    today = timezone.now().date()
-    start_week = today - timedelta(days=today.weekday())
+    # 3. Reyting oldindan saralangan holda saqlanadi (CohortMembership.xp) - bu yerda qayta saralanmaydi
+    # Reyting replikadan o'qiladi (bir necha soniyalik kechikish reyting uchun muhim emas)
+    with read_replica():
+        leaderboard_data = [
+            {'profile': m.user.profile, 'xp': m.xp}
+            for m in cohort_leaderboard(membership.cohort_id)
+        ]
 
-    # Bitta so'rov bilan shu hafta uchun barcha statistikalarni olamiz
-    weekly_stats_map = {
-        stat.user_id: stat.xp_earned
-        for stat in WeeklyStats.objects.filter(start_date=start_week)
-    }
-
-    leaderboard_data = []
-    for p in profiles_in_league:
-        xp = weekly_stats_map.get(p.user.id, 0)
-        leaderboard_data.append({
-            'profile': p,
-            'xp': xp
-        })
-
-    # XP bo'yicha kamayish tartibida saralash
-    leaderboard_data.sort(key=lambda x: x['xp'], reverse=True)
-
-    # User rankini aniqlash
-    user_rank = 0
-    for idx, item in enumerate(leaderboard_data):
-        if item['profile'].user == request.user:
-            user_rank = idx + 1
-            break
-
-    current_user_xp = weekly_stats_map.get(request.user.id, 0)
+        # User rankini aniqlash
+        user_rank = cohort_rank(membership)
+    current_user_xp = membership.xp
 
     return render(request, 'vocabulary/leagues.html', {
         'current_league': current_league,
@@ -637,10 +569,7 @@ def games_menu(request):
 
 @login_required
 def test_setup(request):
-    user_created = list(Word.objects.filter(author=request.user))
-    user_saved = list(request.user.saved_words.all())
-    unique_words = list(set(user_created + user_saved))
-    word_count = len(unique_words)
+    word_count = vocabulary_count(request.user)
     if word_count < 4:
         return render(request, 'vocabulary/low_words.html', {'count': word_count, 'threshold': 4})
     return render(request, 'vocabulary/test_setup.html')
@@ -648,79 +577,25 @@ def test_setup(request):
 @login_required
 def test_start(request):
     if request.method == 'POST':
-        limit = request.POST.get('limit')
-        request.session['test_stats'] = {
-            'total_questions': 0,
-            'correct': 0,
-            'wrong': 0,
-            'limit': int(limit) if limit != 'infinite' else 'infinite',
-            'potential_coins': 0,
-        }
+        limit = game_sessions.parse_limit(request.POST.get('limit'), default=10, maximum=vocabulary_count(request.user))
+        game_sessions.start(request.user, 'test', limit=limit)
         return redirect('test_play')
     return redirect('test_setup')
 
 @login_required
 def test_play(request):
-    stats = request.session.get('test_stats', None)
+    stats = game_sessions.active(request.user, 'test')
     if not stats:
         return redirect('games_menu')
     
-    if request.GET.get('check_answer'):
-        is_correct = request.GET.get('is_correct') == 'true'
-        word_id = request.GET.get('word_id')
-        if word_id:
-            try:
-                word_obj = Word.objects.get(id=word_id)
-                update_word_progress(request.user, word_obj, is_correct)
-            except Word.DoesNotExist:
-                pass
-
-        stats['total_questions'] += 1
-        if is_correct:
-            stats['correct'] += 1
-        else:
-            stats['wrong'] += 1
-
-        w_stats = get_weekly_stats(request.user)
-        w_stats.total_questions += 1
-        if is_correct:
-            w_stats.correct_answers += 1
-            try:
-                word_obj = Word.objects.get(id=word_id)
-                if word_obj.author is None:
-                     stats['potential_coins'] = stats.get('potential_coins', 0) + 1
-            except Word.DoesNotExist:
-                pass
-        w_stats.save()
-        
-        request.session['test_stats'] = stats
-        request.session.modified = True
-        
-        limit = stats['limit']
-        if limit != 'infinite' and stats['total_questions'] >= limit:
-            return redirect('test_result')
-        return redirect('test_play')
-
-    user_created = list(Word.objects.filter(author=request.user))
-    user_saved = list(request.user.saved_words.all())
-    my_vocabulary = list(set(user_created + user_saved))
-    
-    if len(my_vocabulary) < 4:
+    # Javoblar sahifadan to'plab yuboriladi (submit_answers_api), keyingi savollar - game_questions_api
+    if stats.remaining == 0:
+        return redirect('test_result')
+    if vocabulary_count(request.user) < 4:
         return redirect('test_setup')
-        
-    today = timezone.now().date()
-    due_ids = UserWordProgress.objects.filter(
-        user=request.user,
-        next_review_date__lte=today
-    ).values_list('word_id', flat=True)
-
-    due_words = [w for w in my_vocabulary if w.id in due_ids]
-    if due_words:
-        correct_word = random.choice(due_words)
-    else:
-        correct_word = random.choice(my_vocabulary)
 
-    wrong_words = random.sample([w for w in my_vocabulary if w != correct_word], 3)
+    # Takrorlash navbatidan (review_queue.py) - lug'atni to'liq yuklamasdan
+    correct_word, wrong_words = next_question(request.user, distractors=3)
     variants = wrong_words + [correct_word]
     random.shuffle(variants)
     
@@ -733,18 +608,14 @@ def test_play(request):
 
 @login_required
 def test_result(request):
-    stats = request.session.get('test_stats')
-    if not stats:
+    stats = game_sessions.active(request.user, 'test')
+    # Qatorni o'chirgan so'rov natijani hisoblaydi - sahifa ikki marta ochilsa ball ikki marta qo'shilmaydi
+    if not stats or not game_sessions.finish(stats):
         return redirect('games_menu')
     
     message = ""
-    if stats['total_questions'] > 0:
-        if not stats.get('saved_stats', False):
-             w_stats = get_weekly_stats(request.user)
-             w_stats.games_played += 1
-             w_stats.save()
-             stats['saved_stats'] = True
-             request.session['test_stats'] = stats
+    if stats.total_questions > 0:
+        w_stats = increment_weekly_stats(get_weekly_stats(request.user), games_played=1)
 
         profile = request.user.profile
         today = timezone.now().date()
@@ -753,49 +624,47 @@ def test_result(request):
             profile.daily_match_count = 0
             profile.daily_write_count = 0
             profile.last_game_date = today
-            profile.save()
+            profile.save(update_fields=['daily_test_count', 'daily_match_count', 'daily_write_count', 'last_game_date'])
 
-        accuracy = (stats['correct'] / stats['total_questions']) * 100
-        limit = stats['limit']
+        accuracy = (stats.correct / stats.total_questions) * 100
+        limit = stats.limit
         eligible_for_coins = False
+        config = get_site_config()
 
-        if accuracy >= 60:
+        if accuracy >= config.pass_accuracy:
             if limit == 'infinite':
-                if stats['total_questions'] > 30:
+                if stats.total_questions > 30:
                     eligible_for_coins = True
             else:
-                if stats['total_questions'] >= limit:
+                if stats.total_questions >= limit:
                     eligible_for_coins = True
 
         earned_coins = 0
         if eligible_for_coins:
-            earned_coins = stats.get('potential_coins', 0)
+            earned_coins = stats.potential_coins
             if earned_coins > 0:
-                w_stats.coins_earned += earned_coins
-                w_stats.save()
+                increment_weekly_stats(w_stats, coins_earned=earned_coins)
 
-        stats['earned_coins'] = earned_coins
+        stats.earned_coins = earned_coins
 
-        if stats['total_questions'] < 10:
+        if stats.total_questions < 10:
              message = "Ball olish uchun kamida 10 ta savol yechish kerak!"
-        elif accuracy < 60:
-             message = f"Natija past ({int(accuracy)}%). Ball olish uchun 60% kerak."
-        elif profile.daily_test_count >= 3:
-             message = "Bugungi Test limiti (3/3) to'lgan."
+        elif accuracy < config.pass_accuracy:
+             message = f"Natija past ({int(accuracy)}%). Ball olish uchun {config.pass_accuracy}% kerak."
+        elif profile.daily_test_count >= config.daily_test_limit:
+             message = f"Bugungi Test limiti ({config.daily_test_limit}/{config.daily_test_limit}) to'lgan."
         else:
-            profile.daily_test_count += 1
-            profile.save()
+            increment_profile(profile, daily_test_count=1)
             message = "Ajoyib! Kunlik maqsadga +1 ball qo'shildi."
-            stats['saved'] = True
+            stats.saved = True
             check_streak_update(profile)
 
-    request.session.pop('test_stats', None)
-    
     context = {
         'stats': stats,
         'message': message,
-        'accuracy': int(accuracy) if stats['total_questions'] > 0 else 0,
-        'earned_coins': stats.get('earned_coins', 0)
+        'accuracy': int(accuracy) if stats.total_questions > 0 else 0,
+        'passed': stats.total_questions > 0 and accuracy >= get_site_config().pass_accuracy,
+        'earned_coins': stats.earned_coins
     }
     return render(request, 'vocabulary/test_result.html', context)
 
@@ -803,12 +672,7 @@ def test_result(request):
 
 @login_required
 def match_play(request):
-    created_words = Word.objects.filter(author=request.user)
-    saved_words = request.user.saved_words.all()
-    all_words_qs = (created_words | saved_words).distinct()
-    all_words = list(all_words_qs)
-    
-    count = len(all_words)
+    count = vocabulary_count(request.user)
     threshold = 6
     if count < threshold:
         return render(request, 'vocabulary/low_words.html', {
@@ -816,13 +680,16 @@ def match_play(request):
             'threshold': threshold
         })
 
+    rounds = 3
     if request.method == 'POST':
-        rounds = int(request.POST.get('rounds', 3))
-    else:
-        rounds = 3
+        try:
+            rounds = min(max(int(request.POST.get('rounds', 3)), 1), game_sessions.MAX_ROUNDS)
+        except ValueError:
+            pass
     
     cards_per_round = 5 
     total_words_needed = rounds * cards_per_round
+    all_words = list(vocabulary_words(request.user).order_by('?')[:total_words_needed])
 
     while len(all_words) < total_words_needed:
         all_words += all_words 
@@ -838,9 +705,7 @@ def match_play(request):
         cards_data.append({'id': word.id, 'text': word.japanese_word})
         cards_data.append({'id': word.id, 'text': word.meaning})
 
-    request.session['match_playing'] = True
-    request.session['match_rounds'] = rounds
-    request.session['match_potential_coins'] = match_potential_coins
+    game_sessions.start(request.user, 'match', rounds=rounds, potential_coins=match_potential_coins)
 
     return render(request, 'vocabulary/match_play.html', {
         'cards_json': json.dumps(cards_data), 
@@ -849,18 +714,12 @@ def match_play(request):
 
 @login_required
 def match_result(request):
-    if not request.session.get('match_playing'):
+    game = game_sessions.active(request.user, 'match')
+    if not game or not game_sessions.finish(game):
         return redirect('games_menu')
 
-    del request.session['match_playing']
-    rounds = request.session.get('match_rounds', 3)
-    w_stats = get_weekly_stats(request.user)
-    w_stats.games_played += 1
-
-    earned_coins = request.session.get('match_potential_coins', 0)
-    w_stats.coins_earned += earned_coins
-    w_stats.save()
-    request.session['match_last_earned_coins'] = earned_coins
+    earned_coins = game.potential_coins
+    increment_weekly_stats(get_weekly_stats(request.user), games_played=1, coins_earned=earned_coins)
 
     profile = request.user.profile
     today = timezone.now().date()
@@ -870,24 +729,25 @@ def match_result(request):
         profile.daily_match_count = 0
         profile.daily_write_count = 0
         profile.last_game_date = today
-        profile.save()
+        profile.save(update_fields=['daily_test_count', 'daily_match_count', 'daily_write_count', 'last_game_date'])
         
     saved = False
     message = ""
     
-    if profile.daily_match_count < 3:
-        profile.daily_match_count += 1
-        profile.save()
+    match_limit = get_site_config().daily_match_limit
+    if profile.daily_match_count < match_limit:
+        increment_profile(profile, daily_match_count=1)
         saved = True
         message = "Barakalla! +1 Ball qo'shildi."
         check_streak_update(profile)
     else:
-        message = "Bugungi Matching limiti to'lgan (3/3)."
+        message = f"Bugungi Matching limiti to'lgan ({match_limit}/{match_limit})."
         
     return render(request, 'vocabulary/match_result.html', {
         'saved': saved,
         'message': message,
-        'count': profile.daily_match_count
+        'count': profile.daily_match_count,
+        'earned_coins': earned_coins,
     })
 
 @login_required
@@ -897,10 +757,7 @@ def match_setup(request):
 # --- WRITING (YOZISH) O'YINI ---
 @login_required
 def write_setup(request):
-    created_words = Word.objects.filter(author=request.user)
-    saved_words = request.user.saved_words.all()
-    unique_words = list((created_words | saved_words).distinct())
-    word_count = len(unique_words)
+    word_count = vocabulary_count(request.user)
     if word_count < 5:
         return render(request, 'vocabulary/low_words.html', {
             'count': word_count, 
@@ -911,83 +768,51 @@ def write_setup(request):
 @login_required
 def write_start(request):
     if request.method == 'POST':
-        limit = request.POST.get('limit', '5')
-        request.session['write_limit'] = limit
-        request.session['write_stats'] = {
-            'correct': 0,
-            'wrong': 0,
-            'total_questions': 0,
-            'potential_coins': 0,
-        }
-        request.session['write_playing'] = True
+        limit = game_sessions.parse_limit(request.POST.get('limit', '5'), default=5, maximum=vocabulary_count(request.user))
+        game_sessions.start(request.user, 'write', limit=limit)
         return redirect('write_play')
     return redirect('write_setup')
 
 @login_required
 def write_play(request):
-    if not request.session.get('write_playing'):
+    stats = game_sessions.active(request.user, 'write')
+    if not stats:
         return redirect('write_setup')
-
-    stats = request.session.get('write_stats')
-    limit = request.session.get('write_limit')
+    limit = stats.limit
 
     if request.method == 'POST':
         word_id = request.POST.get('word_id')
-        user_answer = request.POST.get('user_answer', '').strip().lower()
+        user_answer = request.POST.get('user_answer', '')
         target_word = get_object_or_404(Word, id=word_id)
-        valid_answers = []
-        jp_word = target_word.japanese_word.lower()
-        valid_answers.append(jp_word)
-        if target_word.hiragana:
-            valid_answers.append(target_word.hiragana.lower())
-        match = re.search(r'(.*?)\s*\((.*?)\)', jp_word)
-        if match:
-            part1 = match.group(1).strip()
-            part2 = match.group(2).strip()
-            if part1: valid_answers.append(part1)
-            if part2: valid_answers.append(part2)
-        
-        is_correct = (user_answer in valid_answers)
-        stats['total_questions'] += 1
+        is_correct = is_valid_answer(user_answer, answer_forms([target_word.id])[target_word.id])
         if is_correct:
-            stats['correct'] += 1
             messages.success(request, f"To'g'ri! {target_word.japanese_word}")
         else:
-            stats['wrong'] += 1
             messages.error(request, f"Xato! To'g'ri javob: {target_word.japanese_word}")
             
         update_word_progress(request.user, target_word, is_correct)
-        w_stats = get_weekly_stats(request.user)
-        w_stats.total_questions += 1
+        increment_weekly_stats(
+            get_weekly_stats(request.user),
+            total_questions=1,
+            correct_answers=1 if is_correct else 0,
+        )
+        coins = 0
         if is_correct:
-            w_stats.correct_answers += 1
+            bump_counter(request.user, 'correct') # Mergan
             if target_word.author is None:
-                stats['potential_coins'] = stats.get('potential_coins', 0) + 1
-        w_stats.save()
-        request.session['write_stats'] = stats
-        
-        if limit != 'infinite':
-            limit_int = int(limit)
-            if stats['total_questions'] >= limit_int:
-                return redirect('write_result')
+                coins = 1
+        game_sessions.record(stats, correct=int(is_correct), coins=coins)
+
+        if stats.remaining == 0:
+            return redirect('write_result')
         return redirect('write_play')
 
-    created_words = Word.objects.filter(author=request.user)
-    saved_words = request.user.saved_words.all()
-    all_words = list((created_words | saved_words).distinct())
-    if len(all_words) < 5:
+    if stats.remaining == 0:
+        return redirect('write_result')
+    if vocabulary_count(request.user) < 5:
          return redirect('write_setup')
 
-    today = timezone.now().date()
-    due_ids = UserWordProgress.objects.filter(
-        user=request.user,
-        next_review_date__lte=today
-    ).values_list('word_id', flat=True)
-    due_words = [w for w in all_words if w.id in due_ids]
-    if due_words:
-        word = random.choice(due_words)
-    else:
-        word = random.choice(all_words)
+    word, _ = next_question(request.user)
 
     context = {
         'word': word,
@@ -998,16 +823,12 @@ def write_play(request):
 
 @login_required
 def write_result(request):
-    if not request.session.get('write_playing'):
+    stats = game_sessions.active(request.user, 'write')
+    if not stats or not game_sessions.finish(stats):
         return redirect('games_menu')
-
-    del request.session['write_playing']
-    stats = request.session.get('write_stats', {'correct':0, 'wrong':0, 'total_questions':0})
-    limit = request.session.get('write_limit', '5')
+    limit = stats.limit
     
-    w_stats = get_weekly_stats(request.user)
-    w_stats.games_played += 1
-    w_stats.save()
+    w_stats = increment_weekly_stats(get_weekly_stats(request.user), games_played=1)
 
     profile = request.user.profile
     today = timezone.now().date()
@@ -1016,41 +837,40 @@ def write_result(request):
         profile.daily_match_count = 0
         profile.daily_write_count = 0
         profile.last_game_date = today
-        profile.save()
+        profile.save(update_fields=['daily_test_count', 'daily_match_count', 'daily_write_count', 'last_game_date'])
 
     accuracy = 0
-    if stats['total_questions'] > 0:
-        accuracy = int((stats['correct'] / stats['total_questions']) * 100)
+    if stats.total_questions > 0:
+        accuracy = int((stats.correct / stats.total_questions) * 100)
 
     eligible_for_coins = False
-    if accuracy >= 60:
+    config = get_site_config()
+    if accuracy >= config.pass_accuracy:
         if limit == 'infinite':
-            if stats['total_questions'] > 30:
+            if stats.total_questions > 30:
                 eligible_for_coins = True
         else:
-            if stats['total_questions'] >= int(limit):
+            if stats.total_questions >= limit:
                 eligible_for_coins = True
 
     earned_coins = 0
     if eligible_for_coins:
-        earned_coins = stats.get('potential_coins', 0)
+        earned_coins = stats.potential_coins
         if earned_coins > 0:
-            w_stats.coins_earned += earned_coins
-            w_stats.save()
+            increment_weekly_stats(w_stats, coins_earned=earned_coins)
 
-    stats['earned_coins'] = earned_coins
+    stats.earned_coins = earned_coins
     saved = False
     message = ""
     
-    if stats['total_questions'] < 5:
+    if stats.total_questions < 5:
         message = "Ball olish uchun kamida 5 ta so'z yozish kerak."
-    elif accuracy < 60:
-        message = f"Natija past ({accuracy}%). Ball olish uchun 60% kerak."
-    elif profile.daily_write_count >= 3:
-        message = "Bugungi Yozish limiti (3/3) to'lgan."
+    elif accuracy < config.pass_accuracy:
+        message = f"Natija past ({accuracy}%). Ball olish uchun {config.pass_accuracy}% kerak."
+    elif profile.daily_write_count >= config.daily_write_limit:
+        message = f"Bugungi Yozish limiti ({config.daily_write_limit}/{config.daily_write_limit}) to'lgan."
     else:
-        profile.daily_write_count += 1
-        profile.save()
+        increment_profile(profile, daily_write_count=1)
         saved = True
         message = "Ajoyib! Kunlik maqsadga +1 ball qo'shildi."
         check_streak_update(profile)
@@ -1058,6 +878,7 @@ def write_result(request):
     return render(request, 'vocabulary/write_result.html', {
         'stats': stats,
         'accuracy': accuracy,
+        'passed': accuracy >= config.pass_accuracy,
         'saved': saved,
         'message': message,
         'count': profile.daily_write_count,
@@ -1065,6 +886,191 @@ def write_result(request):
         'earned_coins': earned_coins
     })
 
+# --- JAVOBLARNI TO'PLAB YUBORISH (BATCH API) ---
+# Klient javoblarni buferda yig'ib, bitta so'rov bilan yuboradi:
+# {"game": "test" | "write", "answers": [{"word_id": 1, "is_correct": true, "timestamp": 1700000000}, ...]}
+# Yozish o'yinida "is_correct" o'rniga "user_answer" yuboriladi va server o'zi tekshiradi.
+
+BATCH_GAMES = ('test', 'write')
+QUESTION_BATCH_SIZE = 10 # game_questions_api bir so'rovda beradigan savollar
+
+def _game_result_url(game):
+    return reverse('test_result' if game == 'test' else 'write_result')
+
+@login_required
+def submit_answers_api(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        game = data.get('game')
+        answers = list(data.get('answers', []))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': "Noto'g'ri JSON"}, status=400)
+
+    if game not in BATCH_GAMES:
+        return JsonResponse({'error': "Noma'lum o'yin"}, status=400)
+    stats = game_sessions.active(request.user, game)
+    if not stats:
+        return JsonResponse({'error': "O'yin boshlanmagan"}, status=409)
+
+    try:
+        word_ids = [int(a['word_id']) for a in answers]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return JsonResponse({'error': "word_id noto'g'ri"}, status=400)
+    try:
+        # Javob vaqti (ms, Date.now()) - javoblar shu tartibda qo'llanadi
+        timestamps = [float(a.get('timestamp') or 0) for a in answers]
+    except (TypeError, ValueError):
+        return JsonResponse({'error': "timestamp noto'g'ri (Date.now() kabi son bo'lishi kerak)"}, status=400)
+    order = sorted(range(len(answers)), key=timestamps.__getitem__)
+    answers = [answers[i] for i in order]
+    word_ids = [word_ids[i] for i in order]
+
+    remaining = stats.remaining
+    if remaining is not None:
+        answers = answers[:remaining]
+        word_ids = word_ids[:remaining]
+
+    user = request.user
+    today = timezone.now().date()
+    words = Word.objects.in_bulk(set(word_ids))
+    forms = answer_forms(words.keys()) if game == 'write' else {}
+
+    results = []
+    with transaction.atomic():
+        progress_map = {
+            p.word_id: p for p in UserWordProgress.objects.filter(user=user, word_id__in=words.keys())
+        }
+        new_progress = {}
+        was_mastered = {word_id: p.level >= 5 for word_id, p in progress_map.items()}
+
+        # Rejalashtiruvchi uchun (so'z, javob) ketma-ketligi - oxirida birdaniga hisoblanadi
+        scheduled_rows = []
+        scheduled_answers = []
+
+        # Haftalik XP ketma-ket "0 dan pastga tushmaslik" qoidasi: xp -> max(xp_floor, xp + xp_delta)
+        xp_delta = 0
+        xp_floor = None
+        correct_count = 0
+        coins = 0
+
+        for answer, word_id in zip(answers, word_ids):
+            word = words.get(word_id)
+            if word is None:
+                continue
+
+            if game == 'write':
+                is_correct = is_valid_answer(str(answer.get('user_answer', '')), forms[word_id])
+            else:
+                is_correct = answer.get('is_correct') is True
+
+            progress = progress_map.get(word_id)
+            if progress is None:
+                progress = UserWordProgress(user=user, word=word, next_review_date=today)
+                progress_map[word_id] = new_progress[word_id] = progress
+                was_mastered[word_id] = False
+
+            delta = apply_answer(progress, is_correct, today)
+            scheduled_rows.append(progress)
+            scheduled_answers.append(is_correct)
+            xp_delta += delta
+            xp_floor = 0 if xp_floor is None else max(0, xp_floor + delta)
+
+            if is_correct:
+                correct_count += 1
+                if word.author is None:
+                    coins += 1
+            results.append({
+                'word_id': word_id,
+                'is_correct': is_correct,
+                'correct_answer': word.japanese_word,
+            })
+
+        if not results:
+            finished = remaining == 0
+            return JsonResponse({
+                'accepted': 0,
+                'results': [],
+                'stats': stats.to_json(),
+                'finished': finished,
+                'redirect': _game_result_url(game) if finished else None,
+            })
+
+        scheduler = get_scheduler()
+        scheduler.schedule_batch(scheduled_rows, scheduled_answers, today)
+
+        UserWordProgress.objects.bulk_create(new_progress.values())
+        existing = [p for word_id, p in progress_map.items() if word_id not in new_progress]
+        if existing:
+            UserWordProgress.objects.bulk_update(
+                existing, ['xp', 'level', 'next_review_date', *scheduler.fields]
+            )
+
+        increment_weekly_stats(
+            get_weekly_stats(user),
+            xp_floor=xp_floor,
+            total_questions=len(results),
+            correct_answers=correct_count,
+            xp_earned=xp_delta,
+        )
+
+        mastered_delta = sum(
+            (p.level >= 5) - was_mastered[word_id] for word_id, p in progress_map.items()
+        )
+        bump_counter(user, 'master', mastered_delta)
+        bump_counter(user, 'correct', correct_count) # Mergan
+        game_sessions.record(stats, answered=len(results), correct=correct_count, coins=coins)
+
+    finished = stats.remaining == 0
+    return JsonResponse({
+        'accepted': len(results),
+        'results': results,
+        'stats': stats.to_json(),
+        'finished': finished,
+        'redirect': _game_result_url(game) if finished else None,
+    })
+
+@login_required
+def game_questions_api(request):
+    """
+    Keyingi savollar to'plami: /api/games/questions/?game=test&count=10
+    O'yin sahifasi savollarni oldindan oladi, javoblarni yig'ib submit_answers_api ga yuboradi.
+    """
+    game = request.GET.get('game')
+    if game not in BATCH_GAMES:
+        return JsonResponse({'error': "Noma'lum o'yin"}, status=400)
+    stats = game_sessions.active(request.user, game)
+    if not stats:
+        return JsonResponse({'error': "O'yin boshlanmagan"}, status=409)
+
+    try:
+        count = min(max(int(request.GET.get('count', QUESTION_BATCH_SIZE)), 1), QUESTION_BATCH_SIZE)
+    except ValueError:
+        count = QUESTION_BATCH_SIZE
+    if stats.remaining is not None:
+        count = min(count, stats.remaining)
+
+    distractors = 3 if game == 'test' else 0
+    if count == 0 or vocabulary_count(request.user) < distractors + 1:
+        return JsonResponse({'questions': [], 'stats': stats.to_json()})
+
+    questions = []
+    for word, wrong_words in next_questions(request.user, count, distractors=distractors):
+        if game == 'write':
+            questions.append({'word_id': word.id, 'meaning': word.meaning})
+            continue
+        variants = wrong_words + [word]
+        random.shuffle(variants)
+        questions.append({
+            'word_id': word.id,
+            'japanese_word': word.japanese_word,
+            'hiragana': word.hiragana,
+            'variants': [{'id': variant.id, 'meaning': variant.meaning} for variant in variants],
+        })
+    return JsonResponse({'questions': questions, 'stats': stats.to_json()})
+
 @login_required
 def quiz_home(request):
     return redirect('games_menu')
@@ -1072,31 +1078,10 @@ def quiz_home(request):
 @staff_member_required
 def upload_words(request):
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        excel_file = request.FILES['excel_file']
-        try:
-            df = pd.read_excel(excel_file)
-            added_count = 0
-            for index, row in df.iterrows():
-                jap = str(row['Japanese']).strip()
-                hira = str(row['Hiragana']).strip() if pd.notna(row['Hiragana']) else ""
-                mean = str(row['Meaning']).strip()
-                topics_str = str(row['Topics']) if pd.notna(row['Topics']) else ""
-                word, created = Word.objects.get_or_create(
-                    japanese_word=jap,
-                    defaults={'hiragana': hira, 'meaning': mean}
-                )
-                if topics_str:
-                    topic_names = [t.strip() for t in topics_str.split(',')]
-                    for t_name in topic_names:
-                        if t_name:
-                            topic_obj, _ = Topic.objects.get_or_create(name=t_name)
-                            word.topics.add(topic_obj)
-                word.save()
-                added_count += 1
-            messages.success(request, f"{added_count} ta so'z muvaffaqiyatli yuklandi!")
-        except Exception as e:
-            messages.error(request, f"Xatolik: {str(e)}")
-    return render(request, 'vocabulary/upload.html')
+        job = start_import(request.FILES['excel_file'], user=request.user)
+        messages.info(request, f"Fayl qabul qilindi, so'zlar fonda yuklanmoqda (#{job.id}).")
+        return redirect(f"{reverse('upload_words')}?job={job.id}")
+    return render(request, 'vocabulary/upload.html', {'job': _requested_import_job(request)})
 
 @staff_member_required
 def upload_book_words(request):
@@ -1130,68 +1115,161 @@ def upload_book_words(request):
         else:
             messages.error(request, "Mavzu tanlanmagan!")
             return redirect('upload_book_words')
-        try:
-            df = pd.read_excel(excel_file)
-            added_count = 0
-            for index, row in df.iterrows():
-                jap = str(row['Japanese']).strip()
-                hira = str(row['Hiragana']).strip() if pd.notna(row['Hiragana']) else ""
-                mean = str(row['Meaning']).strip()
-                word, created = Word.objects.get_or_create(
-                    japanese_word=jap,
-                    defaults={'hiragana': hira, 'meaning': mean}
-                )
-                word.topics.add(topic)
-                word.save()
-                added_count += 1
-            messages.success(request, f"{book.title} -> {topic.name}: {added_count} ta so'z muvaffaqiyatli yuklandi!")
-        except Exception as e:
-            messages.error(request, f"Xatolik: {str(e)}")
-        return redirect('upload_book_words')
+        job = start_import(excel_file, user=request.user, topic=topic)
+        messages.info(request, f"{book.title} -> {topic.name}: fayl qabul qilindi, so'zlar fonda yuklanmoqda (#{job.id}).")
+        return redirect(f"{reverse('upload_book_words')}?job={job.id}")
     books = Book.objects.all()
     topics = Topic.objects.all()
     return render(request, 'vocabulary/upload_book.html', {
         'books': books,
-        'topics': topics
+        'topics': topics,
+        'job': _requested_import_job(request),
     })
 
+def _requested_import_job(request):
+    job_id = request.GET.get('job')
+    if not job_id or not job_id.isdigit():
+        return None
+    return ImportJob.objects.filter(id=job_id).first()
+
+@staff_member_required
+def import_job_status(request, job_id):
+    """Yuklash vazifasi holati (upload sahifasi har soniyada so'raydi)"""
+    job = get_object_or_404(ImportJob.objects.select_related('topic'), id=job_id)
+    return JsonResponse(job_status(job))
+
 # --- AI CHAT VIEW ---
+# API kaliti sahifaga berilmaydi - so'rovlar /api/ai-chat/ (llm.py) orqali yuboriladi
 @login_required
 def ai_chat_view(request):
-    config = SiteConfiguration.objects.first()
-    global_api_key = config.gemini_api_key if config else ""
-    return render(request, 'vocabulary/ai_chat.html', {'global_api_key': global_api_key})
+    return render(request, 'vocabulary/ai_chat.html', {
+        'llm_models': llm.models(), 'llm_default_model': llm.default_model(),
+    })
 
 @login_required
 def ai_chat_test_view(request):
-    config = SiteConfiguration.objects.first()
-    global_api_key = config.gemini_api_key if config else ""
-    return render(request, 'vocabulary/ai_chat_v2.html', {'global_api_key': global_api_key})
+    return render(request, 'vocabulary/ai_chat_v2.html', {
+        'llm_models': llm.models(), 'llm_default_model': llm.default_model(),
+    })
 
 @login_required
-def edge_tts_view(request):
+def ai_chat_api(request):
     """
-    API endpoint to generate TTS audio.
-    Expects POST request with 'text' parameter.
+    Gemini proksi. JSON: {model, system, contents, generationConfig, stream, cache}.
+    stream=true bo'lsa javob SSE (text/event-stream), aks holda {'text', 'cached'}.
     """
-    if request.method == "POST":
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    try:
+        data = json.loads(request.body)
+        payload = llm.build_payload(data)
+    except llm.BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': "Noto'g'ri JSON"}, status=400)
+
+    model = data.get('model') or llm.default_model()
+    if model not in llm.models():
+        return JsonResponse({'error': "Bu model ruxsat etilmagan"}, status=400)
+    use_cache = bool(data.get('cache'))
+
+    try:
+        if data.get('stream'):
+            chunks = llm.complete_stream(request.user, model, payload, use_cache)
+            # ASGI sinxron iteratorni oxirigacha yig'ib yuboradi - u yerda async iterator kerak
+            events = llm.AsyncSSEEvents(chunks) if isinstance(request, ASGIRequest) else llm.SSEEvents(chunks)
+            response = StreamingHttpResponse(events, content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no' # nginx bufer qilmasin
+            return response
+        text, cached = llm.complete(request.user, model, payload, use_cache)
+    except llm.LLMError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    return JsonResponse({'text': text, 'cached': cached})
+
+TTS_CACHE_CONTROL = 'private, max-age=31536000, immutable' # kalit kontentdan olinadi - o'zgarmaydi
+
+async def _synthesize_and_cache(key, text, voice):
+    """Edge TTS dan kelgan bo'laklarni darhol uzatadi; to'liq tugasa keshga yozadi"""
+    parts = []
+    async with synthesis_semaphore():
+        async for chunk in stream_edge_audio(tts_cache.normalize_text(text), voice):
+            parts.append(chunk)
+            yield chunk
+    # Mijoz uzilib qolsa (generator yopilsa) bu yerga yetib kelinmaydi - chala audio keshlanmaydi
+    if parts:
+        await asyncio.to_thread(tts_cache.put, key, b''.join(parts))
+
+async def _prepend(first, chunks):
+    if first:
+        yield first
+    async for chunk in chunks:
+        yield chunk
+
+def _read_cached(key):
+    """Keshdagi audio yoki None. Disk bilan ishlaydi (utime, o'qish) - event loop dan thread da chaqiriladi"""
+    path = tts_cache.get(key)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None # shu orada LRU tozalash o'chirib yuborgan
+
+@login_required
+async def edge_tts_view(request):
+    """
+    API endpoint to generate TTS audio (async, ASGI).
+    GET ?text=...&voice=... (brauzer keshlaydi) yoki POST {'text': ..., 'voice': ...}.
+    Audio diskdagi keshdan beriladi (tts_cache); yo'q bo'lsa sintez qilinib, bo'laklar
+    kelishi bilan mijozga uzatiladi. Bir vaqtdagi sintezlar soni TTS_MAX_CONCURRENCY bilan cheklangan.
+    """
+    default_voice = (await site_config.aget()).tts_voice
+    if default_voice not in VOICES:
+        default_voice = DEFAULT_VOICE
+
+    if request.method == "GET":
+        text = request.GET.get('text', '')
+        voice = request.GET.get('voice', default_voice)
+    elif request.method == "POST":
         try:
             data = json.loads(request.body)
             text = data.get('text', '')
+            voice = data.get('voice', default_voice)
         except:
             text = request.POST.get('text', '')
+            voice = request.POST.get('voice', default_voice)
+    else:
+        return JsonResponse({'error': 'GET or POST required'}, status=405)
+
+    if not text:
+         return JsonResponse({'error': 'No text provided'}, status=400)
+    if voice not in VOICES:
+        return JsonResponse({'error': 'Unknown voice'}, status=400)
 
-        if not text:
-             return JsonResponse({'error': 'No text provided'}, status=400)
+    key = tts_cache.cache_key(text, voice)
+    etag = f'"{key}"'
 
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    elif (audio := await asyncio.to_thread(_read_cached, key)) is not None:
+        response = HttpResponse(audio, content_type='audio/mpeg')
+    else:
+        chunks = _synthesize_and_cache(key, text, voice)
         try:
-            # Use 'ja-JP-NanamiNeural' for Japanese
-            # We can make voice configurable later
-            audio_data = get_edge_audio_sync(text, voice="ja-JP-NanamiNeural")
-            response = HttpResponse(audio_data, content_type='audio/mpeg')
-            response['Content-Disposition'] = 'inline; filename="tts_output.mp3"'
-            return response
+            # Birinchi bo'lakni kutamiz - sintez xatosi 200 javobdan oldin aniqlansin
+            first = await anext(chunks, b'')
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
-
-    return JsonResponse({'error': 'POST required'}, status=405)
+        if isinstance(request, ASGIRequest):
+            response = StreamingHttpResponse(_prepend(first, chunks), content_type='audio/mpeg')
+        else:
+            # WSGI da javob boshqa event loop da o'qiladi - audio shu yerning o'zida yig'iladi
+            rest = [chunk async for chunk in chunks]
+            response = HttpResponse(first + b''.join(rest), content_type='audio/mpeg')
+
+    response['Content-Disposition'] = 'inline; filename="tts_output.mp3"'
+    response['ETag'] = etag
+    response['Cache-Control'] = TTS_CACHE_CONTROL
+    return response